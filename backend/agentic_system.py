@@ -5,8 +5,12 @@ Multi-agent workflow for autonomous client analysis and outreach
 import os
 import json
 import re
+import asyncio
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, TypedDict, Annotated
+from typing import Awaitable, Callable, List, Dict, Any, Optional, TypedDict, Annotated
 from datetime import datetime, timezone, timedelta
 import operator
 
@@ -14,13 +18,37 @@ from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, END
 from rag_system import RAGSystem
+from rate_limiter import RateLimitedLLM, RateLimiter
+from llm_cache import CachedLLM, LLMCache
+from metrics import RunMetrics, record
+from result_store import ClientResultStore, client_fingerprint
+from storage import get_storage
+from triage import TRIAGE_ENABLED, shortlist, shortlist_size
+from checkpoint import CHECKPOINT_ENABLED, CHECKPOINT_FILE, RunCheckpoint, TopN, run_key
 
 # Load environment variables
 load_dotenv()
 
+# Maximum number of client workflows in flight during the overnight run
+MAX_CONCURRENT_CLIENTS = int(os.getenv("JARVIS_MAX_CONCURRENT_CLIENTS", "4"))
+
+# Reuse stored results for clients whose record and documents are unchanged
+INCREMENTAL_ANALYSIS = os.getenv("JARVIS_INCREMENTAL_ANALYSIS", "on").lower() not in ("0", "off", "false")
+
+# Set JARVIS_LLM_CACHE=off to always call the model
+LLM_CACHE_ENABLED = os.getenv("JARVIS_LLM_CACHE", "on").lower() not in ("0", "off", "false")
+
+# Chunks retrieved per client and the token budget for the context they form
+RESEARCH_RESULTS = int(os.getenv("JARVIS_RESEARCH_RESULTS", "3"))
+RESEARCH_CONTEXT_TOKENS = int(os.getenv("JARVIS_RESEARCH_CONTEXT_TOKENS", "500"))
+
+# Retrieve only from each client's own documents (chunks tagged with its client_id)
+CLIENT_SCOPED_RETRIEVAL = os.getenv("JARVIS_CLIENT_SCOPED_RETRIEVAL", "on").lower() not in ("0", "off", "false")
+
 
 # ============================================================================
 # PYDANTIC MODELS FOR STRUCTURED OUTPUT
@@ -54,6 +82,9 @@ class AgentState(TypedDict):
     """State passed between agents in the workflow."""
     client: Dict[str, Any]
     rag_context: str
+    allow_reuse: bool
+    context_fingerprint: str
+    cached_result: Dict[str, Any] | None
     opportunity_analysis: OpportunityAnalysis | None
     email_content: EmailContent | None
     errors: Annotated[List[str], operator.add]
@@ -68,29 +99,71 @@ class ResearchAgent:
     
     def __init__(self, rag_system: RAGSystem):
         self.rag = rag_system
+        self._prefetched: Dict[str, List[Dict[str, Any]]] = {}
+    
+    def build_query(self, client: Dict[str, Any]) -> str:
+        """Search query used to find a client's documents."""
+        return f"{client['name']} {client['company']} {' '.join(client.get('pain_points', []))}"
+    
+    def search_scope(self, client: Dict[str, Any]) -> Optional[str]:
+        """client_id filter for this client's searches (None searches every document)."""
+        return client['client_id'] if CLIENT_SCOPED_RETRIEVAL else None
+    
+    def prefetch(self, clients: List[Dict[str, Any]]) -> None:
+        """Fetch context for many clients in one batched search."""
+        start = time.perf_counter()
+        results = self.rag.search_many(
+            [self.build_query(c) for c in clients], n_results=RESEARCH_RESULTS,
+            client_ids=[self.search_scope(c) for c in clients]
+        )
+        self._prefetched = {c['client_id']: r for c, r in zip(clients, results)}
+        record(rag_seconds=time.perf_counter() - start)
+    
+    @property
+    def prefetched(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Prefetched results not yet used, by client_id."""
+        return self._prefetched
+    
+    def retain(self, client_ids) -> None:
+        """Drop prefetched results of clients that will not be researched."""
+        keep = set(client_ids)
+        self._prefetched = {k: v for k, v in self._prefetched.items() if k in keep}
     
     def execute(self, state: AgentState) -> AgentState:
         """Research client using RAG system."""
         client = state["client"]
         
         try:
-            # Build search query
-            search_query = f"{client['name']} {client['company']} {' '.join(client.get('pain_points', []))}"
+            # Use prefetched results when the overnight run batched the searches
+            rag_results = self._prefetched.pop(client['client_id'], None)
+            if rag_results is None:
+                start = time.perf_counter()
+                rag_results = self.rag.search(
+                    self.build_query(client), n_results=RESEARCH_RESULTS, client_id=self.search_scope(client)
+                )
+                record(rag_seconds=time.perf_counter() - start)
             
-            # Search RAG
-            rag_results = self.rag.search(search_query, n_results=5)
+            # Combine whole chunks, best first, up to the context budget
+            sections = []
+            used_tokens = 0
+            for r in rag_results:
+                tokens = r['metadata'].get('token_count') or self.rag.count_tokens(r['content'])
+                if sections and used_tokens + tokens > RESEARCH_CONTEXT_TOKENS:
+                    break
+                sections.append(r)
+                used_tokens += tokens
             
-            # Combine context
             context = "\n\n".join([
                 f"Document: {r['metadata'].get('source', 'Unknown')}\n{r['content']}"
-                for r in rag_results
-            ]) if rag_results else "No additional context available."
+                for r in sections
+            ]) if sections else "No additional context available."
             
-            state["rag_context"] = context[:2000]  # Limit context size
+            state["rag_context"] = context
             print(f"✓ Research Agent: Gathered context for {client['name']}")
             
         except Exception as e:
             state["errors"].append(f"Research Agent error: {str(e)}")
+            record(fallbacks=1)
             state["rag_context"] = "No context available."
         
         return state
@@ -98,7 +171,7 @@ class ResearchAgent:
 class AnalysisAgent:
     """Agent responsible for analyzing opportunities."""
     
-    def __init__(self, llm: ChatGoogleGenerativeAI):
+    def __init__(self, llm: Runnable):
         self.llm = llm
         self.parser = PydanticOutputParser(pydantic_object=OpportunityAnalysis)
     
@@ -174,6 +247,7 @@ Identify the top opportunity and provide a structured analysis.""")
             
         except Exception as e:
             state["errors"].append(f"Analysis Agent error: {str(e)}")
+            record(fallbacks=1)
             # Fallback analysis
             state["opportunity_analysis"] = OpportunityAnalysis(
                 client_id=client['client_id'],
@@ -192,7 +266,7 @@ Identify the top opportunity and provide a structured analysis.""")
 class EmailWriterAgent:
     """Agent responsible for writing personalized emails."""
     
-    def __init__(self, llm: ChatGoogleGenerativeAI):
+    def __init__(self, llm: Runnable):
         self.llm = llm
         self.parser = PydanticOutputParser(pydantic_object=EmailContent)
     
@@ -407,6 +481,7 @@ Return ONLY valid JSON with subject, body, tone, and personalization_elements fi
             except (ValueError, json.JSONDecodeError) as parse_error:
                 # Fallback: Parse from unstructured text
                 print(f"  ⚠ JSON parsing failed, using text extraction for {client['name']}")
+                record(fallbacks=1)
                 state["email_content"] = self._parse_email_from_text(email_text, opportunity, client)
                 print(f"✓ Email Writer Agent: Created email for {client['name']} (text extraction)")
             
@@ -414,6 +489,7 @@ Return ONLY valid JSON with subject, body, tone, and personalization_elements fi
             error_msg = f"Email Writer Agent error: {str(e)}"
             print(f"  ❌ {error_msg}")
             state["errors"].append(error_msg)
+            record(fallbacks=1)
             
             # Ultimate fallback email
             state["email_content"] = EmailContent(
@@ -443,59 +519,165 @@ Your Financial Advisor""",
 class JarvisAgentSystem:
     """Multi-agent system orchestrating the analysis workflow."""
     
-    def __init__(self):
-        """Initialize the agent system."""
-        self.llm = ChatGoogleGenerativeAI(
+    def __init__(
+        self, rag_system: Optional[RAGSystem] = None, llm: Optional[Runnable] = None,
+        data_dir: Optional[Path] = None
+    ):
+        """Initialize the agent system.
+        
+        `rag_system` and `llm` (a chat model, e.g. a local stand-in for
+        benchmarks) replace the defaults when given; `data_dir` holds the
+        client storage, result store, LLM cache and run metrics.
+        """
+        self.data_dir = Path(data_dir) if data_dir else Path(__file__).parent / "data"
+        
+        chat_model = llm or ChatGoogleGenerativeAI(
             model="gemma-3-27b-it",
             google_api_key=os.getenv("GEMINI_API_KEY"),
-            temperature=0.7
+            temperature=0.7,
+            max_retries=1
         )
-        self.rag = RAGSystem()
+        # Every LLM call goes through one shared limiter/retry scheduler;
+        # the client itself makes a single attempt per call.
+        self.llm = RateLimitedLLM(chat_model, RateLimiter())
+        
+        # Identical prompts (unchanged clients) are answered from disk
+        self.llm_cache = None
+        if LLM_CACHE_ENABLED:
+            self.llm_cache = LLMCache(self.data_dir / "llm_cache.sqlite3")
+            self.llm = CachedLLM(self.llm, self.llm_cache, getattr(chat_model, "model", type(chat_model).__name__),
+                                 getattr(chat_model, "temperature", None))
+        
+        self.storage = get_storage(self.data_dir)
+        self.rag = rag_system or RAGSystem(storage=self.storage)
+        self.result_store = ClientResultStore(self.data_dir / "client_results.json")
         
         # Initialize agents
         self.research_agent = ResearchAgent(self.rag)
         self.analysis_agent = AnalysisAgent(self.llm)
         self.email_writer_agent = EmailWriterAgent(self.llm)
         
-        # Build workflow graph
-        self.workflow = self._build_workflow()
+        # Per-stage timings, tokens and retries of the current run
+        self.metrics = RunMetrics()
         
-        self.data_dir = Path(__file__).parent / "data"
+        # Build workflow graphs: scoring for every client, email writing for the selected few
+        self.workflow = self._build_workflow()
+        self.email_workflow = self._build_email_workflow()
     
     def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow."""
+        """Build the scoring workflow: research, change detection and analysis."""
         workflow = StateGraph(AgentState)
         
-        # Add nodes (agents)
-        workflow.add_node("research", self.research_agent.execute)
-        workflow.add_node("analysis", self.analysis_agent.execute)
-        workflow.add_node("email_writer", self.email_writer_agent.execute)
+        # Add nodes (agents), each timed as a stage of the client's run
+        workflow.add_node("research", self.metrics.instrument("research", self.research_agent.execute))
+        workflow.add_node("change_detection", self.metrics.instrument("change_detection", self._detect_changes))
+        workflow.add_node("analysis", self.metrics.instrument("analysis", self.analysis_agent.execute))
         
         # Define edges (workflow)
         workflow.set_entry_point("research")
-        workflow.add_edge("research", "analysis")
-        workflow.add_edge("analysis", "email_writer")
-        workflow.add_edge("email_writer", END)
+        workflow.add_edge("research", "change_detection")
+        workflow.add_conditional_edges(
+            "change_detection",
+            lambda state: "reuse" if state["cached_result"] else "analyze",
+            {"reuse": END, "analyze": "analysis"}
+        )
+        workflow.add_edge("analysis", END)
         
         return workflow.compile()
     
-    def process_client(self, client: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a single client through the agent workflow."""
-        print(f"\n🤖 Processing {client['name']}...")
+    def _build_email_workflow(self) -> StateGraph:
+        """Build the generation workflow, run only for the selected opportunities."""
+        workflow = StateGraph(AgentState)
+        workflow.add_node("email_writer", self.metrics.instrument("email_writer", self.email_writer_agent.execute))
+        workflow.set_entry_point("email_writer")
+        workflow.add_edge("email_writer", END)
+        return workflow.compile()
+    
+    def _detect_changes(self, state: AgentState) -> Dict[str, Any]:
+        """Fingerprint the client's inputs and look up a reusable stored result.
         
-        # Initialize state
-        initial_state: AgentState = {
+        The inputs are the client record and every chunk of the client's
+        ingested documents, not just the chunks retrieved this run.
+        """
+        client = state["client"]
+        fingerprint = client_fingerprint(client, self.rag.client_chunk_ids(client['client_id']))
+        cached_result = None
+        if state["allow_reuse"]:
+            cached_result = self.result_store.get(client['client_id'], fingerprint)
+            if cached_result:
+                print(f"♻️  Change Detection: {client['name']} unchanged, reusing stored result")
+        return {"context_fingerprint": fingerprint, "cached_result": cached_result}
+    
+    def _initial_state(self, client: Dict[str, Any], allow_reuse: bool = False) -> AgentState:
+        """Build the initial workflow state for a client."""
+        return {
             "client": client,
             "rag_context": "",
+            "allow_reuse": allow_reuse,
+            "context_fingerprint": "",
+            "cached_result": None,
             "opportunity_analysis": None,
             "email_content": None,
             "errors": []
         }
+    
+    def _build_score(self, client: Dict[str, Any], final_state: AgentState) -> Optional[Dict[str, Any]]:
+        """Turn a finished scoring state into a scored opportunity.
+        
+        A scored opportunity is a plain dict: client, fingerprint, priority_score,
+        analysis (OpportunityAnalysis fields), clean (no agent fell back) and
+        cached (the stored result it reuses, if any).
+        """
+        fingerprint = final_state["context_fingerprint"]
+        cached = final_state.get("cached_result")
+        if cached:
+            return {"client": client, "fingerprint": fingerprint, "priority_score": cached['priority_score'],
+                    "analysis": cached.get("analysis"), "clean": True, "cached": cached}
+        
+        opportunity = final_state["opportunity_analysis"]
+        if not opportunity:
+            print(f"❌ Failed to score {client['name']}")
+            return None
+        
+        scored = {"client": client, "fingerprint": fingerprint, "priority_score": opportunity.priority_score,
+                  "analysis": opportunity.model_dump(), "clean": not final_state["errors"], "cached": None}
+        self._store_analysis(scored)
+        return scored
+    
+    def _store_analysis(self, scored: Dict[str, Any]) -> None:
+        """Keep a clean new analysis so an unchanged client is not re-analysed next run,
+        even if it was not selected for an email this time."""
+        if not scored["clean"] or scored["cached"]:
+            return
+        client = scored["client"]
+        self.result_store.put(client['client_id'], scored["fingerprint"], {
+            "client_id": client['client_id'],
+            "client_name": client['name'],
+            "opportunity_type": scored["analysis"]["opportunity_type"],
+            "priority_score": scored["priority_score"],
+            "analysis": scored["analysis"]
+        }, datetime.now(timezone.utc).isoformat())
+    
+    def _store_logged_email(self, scored: Dict[str, Any], email: Dict[str, Any]) -> None:
+        """Store an email replayed from the checkpoint log, as _build_result did before the
+        interruption (the interrupted run never saved its result store)."""
+        if scored["clean"] and not email.get("reused"):
+            self.result_store.put(scored["client"]['client_id'], scored["fingerprint"],
+                                  {**email, "analysis": scored["analysis"]}, email["sent_date"])
+    
+    def _build_result(self, scored: Dict[str, Any], final_state: Optional[AgentState]) -> Optional[Dict[str, Any]]:
+        """Turn a scored opportunity and its finished email state into an email record."""
+        client = scored["client"]
+        ist = timezone(timedelta(hours=5, minutes=30))
+        now = datetime.now(ist)
+        email_id = f"email_{now.strftime('%Y%m%d_%H%M%S')}_{client['client_id']}"
         
-        # Run workflow
-        final_state = self.workflow.invoke(initial_state)
+        cached = scored["cached"]
+        if final_state is None:
+            # Same analysis and email as last time, stamped for this run
+            result_record = {k: v for k, v in cached.items() if k != "analysis"}
+            return {**result_record, "id": email_id, "sent_date": now.isoformat(), "reused": True}
         
-        # Extract results
         opportunity = final_state["opportunity_analysis"]
         email = final_state["email_content"]
         
@@ -504,10 +686,7 @@ class JarvisAgentSystem:
             return None
         
         # Create email record
-        ist = timezone(timedelta(hours=5, minutes=30))
-        email_id = f"email_{datetime.now(ist).strftime('%Y%m%d_%H%M%S')}_{client['client_id']}"
-        
-        return {
+        result = {
             "id": email_id,
             "client_id": client['client_id'],
             "client_name": client['name'],
@@ -524,63 +703,311 @@ class JarvisAgentSystem:
             "personalization_elements": email.personalization_elements,
             "agent_workflow": "research → analysis → email_writer"
         }
+        
+        # Only clean runs are worth reusing; fallbacks get another try next time
+        if scored["clean"] and not final_state["errors"]:
+            self.result_store.put(client['client_id'], scored["fingerprint"],
+                                  {**result, "analysis": scored["analysis"]}, now.isoformat())
+        
+        return result
+    
+    def _email_state(self, scored: Dict[str, Any]) -> Optional[AgentState]:
+        """Initial email-writer state, or None when the stored email can be reused."""
+        cached = scored["cached"]
+        if cached and "subject" in cached:
+            return None
+        state = self._initial_state(scored["client"])
+        state["opportunity_analysis"] = OpportunityAnalysis(**scored["analysis"])
+        return state
+    
+    def score_client(self, client: Dict[str, Any], allow_reuse: bool = False) -> Optional[Dict[str, Any]]:
+        """Research and analyse a client (no email); None if it could not be scored."""
+        print(f"\n🤖 Scoring {client['name']}...")
+        final_state = self.workflow.invoke(self._initial_state(client, allow_reuse))
+        return self._build_score(client, final_state)
+    
+    async def ascore_client(self, client: Dict[str, Any], allow_reuse: bool = False) -> Optional[Dict[str, Any]]:
+        """Research and analyse a client without blocking the event loop."""
+        print(f"\n🤖 Scoring {client['name']}...")
+        final_state = await self.workflow.ainvoke(self._initial_state(client, allow_reuse))
+        return self._build_score(client, final_state)
+    
+    def write_email(self, scored: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Write the email for a scored opportunity (or reuse the stored one)."""
+        state = self._email_state(scored)
+        if state is not None:
+            state = self.email_workflow.invoke(state)
+        return self._build_result(scored, state)
     
-    def overnight_analysis_run(self, top_n: int = 8) -> Dict[str, Any]:
-        """Run the overnight analysis using multi-agent workflow."""
+    async def awrite_email(self, scored: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Write the email for a scored opportunity without blocking the event loop."""
+        state = self._email_state(scored)
+        if state is not None:
+            state = await self.email_workflow.ainvoke(state)
+        return self._build_result(scored, state)
+    
+    def process_client(self, client: Dict[str, Any], allow_reuse: bool = False) -> Optional[Dict[str, Any]]:
+        """Process a single client through the whole agent workflow: score, then write its email."""
+        scored = self.score_client(client, allow_reuse)
+        return self.write_email(scored) if scored else None
+    
+    def _run_all(
+        self, items: List[Any], work: Callable[[Any], Any], awork: Callable[[Any], Awaitable[Any]],
+        max_concurrency: int, label: Callable[[Any], str], on_result: Callable[[Any, Any], None]
+    ) -> None:
+        """Apply work to every item, at most max_concurrency at once.
+        
+        Results go to on_result(item, result) as they complete rather than
+        being collected, so memory does not grow with the number of items.
+        """
+        if max_concurrency == 1:
+            for i, item in enumerate(items, 1):
+                print(f"\n[{i}/{len(items)}] {label(item)}")
+                on_result(item, work(item))
+            return
+        asyncio.run(self._run_bounded(items, awork, max_concurrency, label, on_result))
+    
+    async def _run_bounded(
+        self, items: List[Any], awork: Callable[[Any], Awaitable[Any]], max_concurrency: int,
+        label: Callable[[Any], str], on_result: Callable[[Any, Any], None]
+    ) -> None:
+        """Run many client workflows at once, keeping at most max_concurrency in flight."""
+        # Synchronous agent nodes run on the loop's default executor, so size it
+        # to the concurrency limit rather than the interpreter default.
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="jarvis-client")
+        loop.set_default_executor(executor)
+        
+        total = len(items)
+        # Workers pull from one shared iterator, so only max_concurrency items are in flight
+        pending = iter(enumerate(items, 1))
+        
+        async def worker() -> None:
+            for i, item in pending:
+                print(f"\n[{i}/{total}] {label(item)}")
+                on_result(item, await awork(item))
+        
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(max_concurrency, total))))
+        finally:
+            executor.shutdown(wait=True)
+    
+    def overnight_analysis_run(
+        self, top_n: int = 8, max_concurrency: Optional[int] = None, incremental: Optional[bool] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None, triage: Optional[bool] = None,
+        on_email: Optional[Callable[[Dict[str, Any]], None]] = None, checkpoint_enabled: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Run the overnight analysis using multi-agent workflow.
+        
+        Every client is scored first (research and analysis); emails are then
+        written only for the top_n opportunities.
+        
+        Args:
+            top_n: Number of highest-priority opportunities to keep.
+            max_concurrency: Maximum client workflows in flight at once. Defaults to
+                JARVIS_MAX_CONCURRENT_CLIENTS; 1 processes clients sequentially.
+            incremental: Reuse stored results for clients whose record and document
+                chunks are unchanged. Defaults to JARVIS_INCREMENTAL_ANALYSIS.
+            progress: Called with updated counters (phase, clients_total, clients_done,
+                clients_reused, clients_failed, current_client, then emails_total,
+                emails_done and latest_email) as the run advances.
+            triage: Pre-score clients locally and send only the best
+                shortlist_size(top_n) through the LLM workflow. Defaults to JARVIS_TRIAGE.
+            on_email: Called with each selected email record as soon as it is written.
+            checkpoint_enabled: Log each scored client and written email to
+                data/run_checkpoint.jsonl, and resume from that log if the previous
+                run with the same clients was interrupted. Defaults to JARVIS_RUN_CHECKPOINT.
+        """
+        if incremental is None:
+            incremental = INCREMENTAL_ANALYSIS
+        if triage is None:
+            triage = TRIAGE_ENABLED
+        if checkpoint_enabled is None:
+            checkpoint_enabled = CHECKPOINT_ENABLED
+        if max_concurrency is None:
+            max_concurrency = MAX_CONCURRENT_CLIENTS
+        max_concurrency = max(1, max_concurrency)
+        if self.llm_cache:
+            self.llm_cache.reset_stats()
+        self.metrics.reset()
+        
+        ist = timezone(timedelta(hours=5, minutes=30))
+        started_at = datetime.now(ist)
+        
         print("\n" + "="*70)
         print("🌙 JARVIS MULTI-AGENT SYSTEM - Overnight Analysis")
         print("="*70)
         
         # Load clients
-        client_file = self.data_dir / "client_context.json"
-        with open(client_file, 'r') as f:
-            clients = json.load(f)
+        clients = self.storage.list_clients()
         
         print(f"\n📊 Analyzing {len(clients)} clients using agentic workflow...")
-        print("   Agents: Research → Analysis → Email Writer")
+        print("   Agents: Research → Analysis, then Email Writer for the top opportunities")
+        print(f"   Concurrency: {max_concurrency} client(s) in flight")
         
-        # Process each client through agent workflow
-        all_results: List[Dict[str, Any]] = []
-        for i, client in enumerate(clients, 1):
-            print(f"\n[{i}/{len(clients)}] Client: {client['name']}")
-            result = self.process_client(client)
-            if result:
-                all_results.append(result)
+        # Tag documents with their clients (picks up clients added since ingestion),
+        # then retrieve document context for every client in one vectorized step
+        if CLIENT_SCOPED_RETRIEVAL:
+            self.rag.assign_clients(clients)
+        with self.metrics.stage("prefetch"):
+            self.research_agent.prefetch(clients)
+        print(f"   🔎 Prefetched document context for {len(clients)} clients")
         
-        # Sort by priority score
-        all_results.sort(key=lambda x: x['priority_score'], reverse=True)
+        # Pre-score every client locally; only the shortlist costs LLM calls
+        book = clients
+        if triage and len(book) > shortlist_size(top_n):
+            with self.metrics.stage("triage"):
+                clients, _ = shortlist(book, self.research_agent.prefetched, shortlist_size(top_n),
+                                       expected_hits=RESEARCH_RESULTS)
+                self.research_agent.retain(c['client_id'] for c in clients)
+            print(f"   🎯 Triage: shortlisted {len(clients)} of {len(book)} clients for analysis")
         
-        # Take top N
-        top_results = all_results[:top_n]
+        # Resume an interrupted run of the same clients from its checkpoint log
+        checkpoint = RunCheckpoint(self.data_dir / CHECKPOINT_FILE) if checkpoint_enabled else None
+        with checkpoint or nullcontext():
+            scored_ids, logged_emails = checkpoint.open(run_key(clients, top_n)) if checkpoint else (set(), {})
         
-        print(f"\n" + "="*70)
-        print(f"🎯 Top {top_n} Opportunities Selected")
-        print("="*70)
+            # Only the best candidates are kept: top_n plus as many spares to backfill failed emails
+            order = {c['client_id']: i for i, c in enumerate(clients)}
+            candidates = TopN(2 * top_n, key=lambda s: s['priority_score'])
+            reused_count = 0
+            if scored_ids:
+                for scored in checkpoint.scored():
+                    candidates.push(scored, order[scored["client"]['client_id']])
+                    reused_count += 1 if scored["cached"] else 0
+                    # The interrupted run never saved its result store
+                    self._store_analysis(scored)
+                self.research_agent.retain(c['client_id'] for c in clients if c['client_id'] not in scored_ids)
+                print(f"   ⏯️  Resuming: {len(scored_ids)} of {len(clients)} clients already scored")
+        
+            counters = {"phase": "scoring", "clients_in_book": len(book), "clients_total": len(clients),
+                        "clients_done": len(scored_ids), "clients_resumed": len(scored_ids),
+                        "clients_reused": reused_count, "clients_failed": 0, "current_client": None}
+            if progress:
+                progress(dict(counters))
+        
+            def client_scored(client: Dict[str, Any], scored: Optional[Dict[str, Any]]) -> None:
+                counters["clients_done"] += 1
+                counters["current_client"] = client['name']
+                if scored is None:
+                    counters["clients_failed"] += 1
+                else:
+                    counters["clients_reused"] += 1 if scored["cached"] else 0
+                    candidates.push(scored, order[client['client_id']])
+                    if checkpoint:
+                        checkpoint.add_scored(client['client_id'], scored)
+                if progress:
+                    progress(dict(counters))
+        
+            # Phase 1: research and analyse every client (no emails yet)
+            self._run_all(
+                [c for c in clients if c['client_id'] not in scored_ids],
+                lambda c: self.score_client(c, incremental), lambda c: self.ascore_client(c, incremental),
+                max_concurrency, lambda c: f"Client: {c['name']}", on_result=client_scored
+            )
+            reused_count = counters["clients_reused"]
+            ranked = candidates.items()
+        
+            # Phase 2: write emails for the top N only, backfilling any that fail
+            counters.update({"phase": "writing_emails", "current_client": None, "emails_total": min(top_n, len(ranked)),
+                             "emails_done": 0, "emails_written": 0})
+            if progress:
+                progress(dict(counters))
+        
+            top_results: List[Dict[str, Any]] = []
+        
+            def email_finished(scored: Dict[str, Any], result: Optional[Dict[str, Any]]) -> None:
+                client = scored["client"]
+                counters["current_client"] = client['name']
+                if result:
+                    top_results.append(result)
+                    counters["emails_done"] += 1
+                    if client['client_id'] not in logged_emails:
+                        counters["emails_written"] += 0 if result.get("reused") else 1
+                        if checkpoint:
+                            checkpoint.add_email(client['client_id'], result)
+                    if on_email:
+                        on_email(result)
+                if progress:
+                    progress({**counters, "latest_email": {"client": result['client_name'], "subject": result['subject'],
+                                                           "priority": result['priority_score']} if result else None})
+        
+            def logged_email(scored: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                email = logged_emails.get(scored["client"]['client_id'])
+                if email:
+                    self._store_logged_email(scored, email)
+                return email
+        
+            def write(scored: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                return logged_email(scored) or self.write_email(scored)
+        
+            async def awrite(scored: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                return logged_email(scored) or await self.awrite_email(scored)
+        
+            next_candidate = 0
+            while len(top_results) < top_n and next_candidate < len(ranked):
+                batch = ranked[next_candidate:next_candidate + top_n - len(top_results)]
+                next_candidate += len(batch)
+                self._run_all(batch, write, awrite, max_concurrency,
+                              lambda s: f"Email: {s['client']['name']}", on_result=email_finished)
+        
+            # Persist per-client results for the next incremental run
+            self.result_store.prune(c['client_id'] for c in book)
+            self.result_store.save()
+        
+            # Sort by priority score
+            top_results.sort(key=lambda x: (-x['priority_score'], order[x['client_id']]))
+        
+            print(f"\n" + "="*70)
+            print(f"🎯 Top {top_n} Opportunities Selected")
+            print("="*70)
         
-        for i, result in enumerate(top_results, 1):
-            print(f"\n[{i}] {result['client_name']}")
-            print(f"    Opportunity: {result['opportunity_type']}")
-            print(f"    Priority: {result['priority_score']}/10")
-            print(f"    Subject: {result['subject']}")
+            for i, result in enumerate(top_results, 1):
+                print(f"\n[{i}] {result['client_name']}")
+                print(f"    Opportunity: {result['opportunity_type']}")
+                print(f"    Priority: {result['priority_score']}/10")
+                print(f"    Subject: {result['subject']}")
         
-        # Save results
-        emails_file = self.data_dir / "emails_sent.json"
-        with open(emails_file, 'w') as f:
-            json.dump(top_results, f, indent=2)
+            # Save results as this run's emails
+            if progress:
+                progress({"phase": "saving", "current_client": None})
+            run_id = f"run_{started_at.strftime('%Y%m%d_%H%M%S_%f')}"
+            self.storage.record_run(run_id, top_results, started_at.isoformat(), datetime.now(ist).isoformat())
+            if checkpoint:
+                checkpoint.complete()
+        metrics_summary = self.metrics.save(self.data_dir)
         
         print(f"\n" + "="*70)
         print("✅ Multi-Agent Analysis Complete!")
         print(f"   📧 {len(top_results)} emails generated")
-        print(f"   💾 Saved to {emails_file}")
+        print(f"   ♻️  {reused_count} unchanged clients reused, {len(clients) - reused_count} analysed")
+        print(f"   💾 Saved run {run_id} to {self.storage.location}")
+        if self.llm_cache:
+            cache_stats = self.llm_cache.get_stats()
+            print(f"   🗃️  LLM cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        totals = metrics_summary["totals"]
+        print(f"   🔢 LLM: {totals['llm_calls']:.0f} calls, {totals['prompt_tokens']:.0f} prompt / "
+              f"{totals['completion_tokens']:.0f} completion tokens, {totals['retries']:.0f} retries, "
+              f"{totals['fallbacks']:.0f} fallbacks")
+        for name, stage in metrics_summary["stages"].items():
+            print(f"   ⏱️  {name:<16} p50 {stage['seconds']['p50']:.3f}s  p95 {stage['seconds']['p95']:.3f}s  "
+                  f"(n={stage['count']})")
         print(f"   🤖 Powered by LangGraph agentic framework")
         print("="*70 + "\n")
         
         return {
+            "run_id": run_id,
             "total_clients_analyzed": len(clients),
+            "clients_in_book": len(book),
+            "clients_reused": reused_count,
+            "clients_resumed": len(scored_ids),
             "emails_generated": len(top_results),
+            "emails_written": counters["emails_written"],
             "agent_framework": "LangGraph",
             "agents_used": ["ResearchAgent", "AnalysisAgent", "EmailWriterAgent"],
-            "workflow": "research → analysis → email_writer",
+            "workflow": "research → analysis → (top N) email_writer",
+            "llm_cache": self.llm_cache.get_stats() if self.llm_cache else None,
+            "metrics": metrics_summary,
             "top_opportunities": [
                 {
                     "client": r['client_name'],
@@ -592,10 +1019,10 @@ class JarvisAgentSystem:
         }
 
 
-def run_overnight_analysis():
+def run_overnight_analysis(progress: Optional[Callable[[Dict[str, Any]], None]] = None):
     """Standalone function to run the overnight analysis."""
     system = JarvisAgentSystem()
-    return system.overnight_analysis_run(top_n=8)
+    return system.overnight_analysis_run(top_n=8, progress=progress)
 
 
 if __name__ == "__main__":
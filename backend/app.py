@@ -1,16 +1,35 @@
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import asyncio
+from contextlib import asynccontextmanager
 import json
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import sys
 
 # Add backend to path for imports
 sys.path.append(str(Path(__file__).parent))
 
-app = FastAPI(title="Jarvis Auto-Pilot Agent API", version="2.0.0")
+from storage import Page, get_storage
+from dashboard import DashboardView
+from jobs import JobManager
+from metrics import load_summary, metric_lines, prometheus_text
+from container import get_container
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the job worker at startup and stop it on shutdown."""
+    # The worker builds the vector store, embedding model, LLM client and workflow once;
+    # this process only reads the ingest manifest for document stats
+    job_manager.start()
+    yield
+    job_manager.shutdown()
+
+
+app = FastAPI(title="Jarvis Auto-Pilot Agent API", version="2.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -19,25 +38,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Data file paths
 DATA_DIR = Path(__file__).parent / "data"
-EMAILS_FILE = DATA_DIR / "emails_sent.json"
-RESPONSES_FILE = DATA_DIR / "responses.json"
-CLIENT_CONTEXT_FILE = DATA_DIR / "client_context.json"
 DOCUMENTS_DIR = DATA_DIR / "client_documents"
 
+# List endpoints return pages; NDJSON exports stream in chunks of EXPORT_PAGE_SIZE
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_PAGE_SIZE = 500
 
-def load_json_file(file_path: Path) -> List[Dict[str, Any]]:
-    """Load and parse a JSON file."""
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-    except json.JSONDecodeError:
-        return []
+# Job event streams check for progress this often and send a keep-alive comment when idle
+JOB_EVENTS_INTERVAL_SECONDS = 0.5
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Clients, emails and responses (SQLite by default, see storage.py)
+storage = get_storage(DATA_DIR)
+
+# Dashboard and stats payloads, kept up to date as runs and responses are written
+dashboard_view = DashboardView(storage)
+
+# Ingest manifest for document stats (see container.py)
+container = get_container()
+
+# Analysis and ingestion run in a warmed worker process; one job per type at a time
+job_manager = JobManager(lock_dir=DATA_DIR, initializer="container:warm_worker")
 
 
 @app.get("/")
@@ -57,123 +84,42 @@ async def root():
             "activity": "/api/activity",
             "warm_leads": "/api/warm-leads",
             "run_analysis": "/api/run-analysis",
+            "jobs": "/api/jobs",
             "ingest_documents": "/api/ingest-documents",
-            "rag_stats": "/api/rag-stats"
+            "rag_stats": "/api/rag-stats",
+            "rag_documents": "/api/rag-documents",
+            "run_metrics": "/api/run-metrics",
+            "metrics": "/api/metrics"
         }
     }
 
 
 @app.get("/api/dashboard")
-async def get_dashboard():
+async def get_dashboard(request: Request):
     """Get complete dashboard data - the main view for advisors."""
-    emails = load_json_file(EMAILS_FILE)
-    responses = load_json_file(RESPONSES_FILE)
-    clients = load_json_file(CLIENT_CONTEXT_FILE)
-    
-    # Calculate metrics
-    total_emails = len(emails)
-    total_responses = len(responses)
-    response_rate = (total_responses / total_emails * 100) if total_emails > 0 else 0
-    
-    # Warm leads (responses with high interest)
-    warm_leads = []
-    for response in responses:
-        # Find corresponding email (by ID first, then fallback to email)
-        email = next((e for e in emails if e["id"] == response["email_id"]), None)
-        if not email:
-            email = next((e for e in emails if e["client_email"] == response["client_email"]), None)
-            
-        client = next((c for c in clients if c["email"] == response["client_email"]), None)
-        
-        if email and client:
-            warm_leads.append({
-                "id": response["id"],
-                "client_name": response["client_name"],
-                "client_email": response["client_email"],
-                "company": client.get("company", ""),
-                "industry": client.get("industry", ""),
-                "email_subject": email.get("subject", ""),
-                "email_sent": email.get("sent_date", ""),
-                "response_received": response.get("response_date", ""),
-                "response_text": response.get("response_text", ""),
-                "sentiment": response.get("sentiment", "neutral"),
-                "interest_level": response.get("interest_level", "medium"),
-                "priority": response.get("priority", "medium"),
-                "next_action": response.get("next_action", "Follow up"),
-                "engagement_score": client.get("engagement_score", 0),
-                "email_body": email.get("full_content") or email.get("body", ""),
-                "context": {
-                    "key_insights": client.get("key_insights", []),
-                    "pain_points": client.get("pain_points", [])
-                }
-            })
-    
-    # Sort warm leads by priority and interest
-    priority_order = {"high": 3, "medium": 2, "low": 1}
-    warm_leads.sort(key=lambda x: (
-        priority_order.get(x["priority"], 0),
-        x["engagement_score"]
-    ), reverse=True)
-    
-    # Recent activity
-    recent_activity = []
-    for email in emails[-10:]:  # Last 10 emails
-        recent_activity.append({
-            "type": "email_sent",
-            "timestamp": email.get("sent_date", ""),
-            "description": f"Sent email to {email.get('client_name', 'Unknown')}",
-            "client": email.get("client_name", ""),
-            "subject": email.get("subject", ""),
-            "id": email.get("id"),
-            "full_content": email.get("full_content") or email.get("body", "")
-        })
-    
-    for response in responses:
-        recent_activity.append({
-            "type": "response_received",
-            "timestamp": response.get("response_date", ""),
-            "description": f"Response from {response.get('client_name', 'Unknown')}",
-            "client": response.get("client_name", ""),
-            "sentiment": response.get("sentiment", "neutral"),
-            "response_text": response.get("response_text", ""),
-            "id": response.get("id")
-        })
-    
-    # Sort by timestamp
-    recent_activity.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+    return snapshot_response(request, "dashboard")
 
-    # Determine last analyzed time (latest email sent)
-    last_analyzed = emails[-1]["sent_date"] if emails else None
-    
-    return JSONResponse(content={
-        "success": True,
-        "data": {
-            "metrics": {
-                "emails_sent_today": total_emails,
-                "responses_received": total_responses,
-                "response_rate": response_rate,
-                "warm_leads_count": len(warm_leads),
-                "total_clients": len(clients)
-            },
-            "last_analyzed": last_analyzed,
-            "warm_leads": warm_leads[:10],  # Top 10
-            "recent_activity": recent_activity[:15],  # Last 15 activities
-            "top_opportunities": emails[:10]  # Top N opportunities from analysis
-        }
-    })
+
+def snapshot_response(request: Request, name: str) -> Response:
+    """Serve a materialized payload, answering 304 when the client's ETag is current."""
+    body, etag = dashboard_view.get(name)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/warm-leads")
 async def get_warm_leads():
     """Get all warm leads with full context."""
-    emails = load_json_file(EMAILS_FILE)
-    responses = load_json_file(RESPONSES_FILE)
-    clients = load_json_file(CLIENT_CONTEXT_FILE)
-    
+    return JSONResponse(content={"success": True, "data": storage.memo("warm_leads", build_warm_leads)})
+
+
+def build_warm_leads() -> List[Dict[str, Any]]:
+    """Warm leads for the current data version."""
     warm_leads = []
-    for response in responses:
-        email = next((e for e in emails if e["id"] == response["email_id"]), None)
-        client = next((c for c in clients if c["email"] == response["client_email"]), None)
+    for response, email, client in storage.responses_with_context(email_fallback=False):
         
         if email and client:
             warm_leads.append({
@@ -205,115 +151,164 @@ async def get_warm_leads():
                 }
             })
     
-    return JSONResponse(content={"success": True, "data": warm_leads})
+    return warm_leads
+
+
+def paged_response(
+    fetch: Callable[[Optional[str], int], Page],
+    cursor: Optional[str],
+    limit: int,
+    format: str,
+    transform: Callable[[Any], Any] = lambda record: record
+) -> Response:
+    """Serve one page as JSON, or stream every remaining match as NDJSON.
+    
+    `fetch(cursor, limit)` returns (records, next_cursor) and raises
+    ValueError for a cursor that is not one of its own. NDJSON exports walk
+    the cursor page by page, so memory stays bounded by EXPORT_PAGE_SIZE.
+    """
+    # The first page is fetched up front so a bad cursor is a 400, not a broken stream
+    try:
+        records, next_cursor = fetch(cursor, EXPORT_PAGE_SIZE if format == "ndjson" else limit)
+    except ValueError as e:
+        return JSONResponse(content={"success": False, "error": str(e)}, status_code=400)
+    
+    if format == "ndjson":
+        def stream(records, next_cursor):
+            while True:
+                if records:
+                    yield "".join(json.dumps(transform(r), ensure_ascii=False) + "\n" for r in records)
+                if not next_cursor:
+                    break
+                records, next_cursor = fetch(next_cursor, EXPORT_PAGE_SIZE)
+        return StreamingResponse(stream(records, next_cursor), media_type="application/x-ndjson")
+    
+    data = [transform(r) for r in records]
+    return JSONResponse(content={"success": True, "data": data, "count": len(data), "next_cursor": next_cursor})
 
 
 @app.get("/api/emails")
-async def get_emails():
-    """Get all sent emails."""
-    emails = load_json_file(EMAILS_FILE)
-    return JSONResponse(content={"success": True, "data": emails, "count": len(emails)})
+async def get_emails(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    client: Optional[str] = Query(None, description="Client email address or client id"),
+    since: Optional[str] = Query(None, description="ISO date/time, inclusive"),
+    until: Optional[str] = Query(None, description="ISO date/time, exclusive"),
+    min_priority: Optional[int] = None,
+    history: bool = Query(False, description="Include emails from earlier runs")
+):
+    """Get sent emails (latest run by default)."""
+    return paged_response(
+        lambda c, n: storage.page_emails(c, n, client=client, since=since, until=until,
+                                         min_priority=min_priority, history=history),
+        cursor, limit, format
+    )
 
 
 @app.get("/api/responses")
-async def get_responses():
-    """Get all client responses."""
-    responses = load_json_file(RESPONSES_FILE)
-    return JSONResponse(content={"success": True, "data": responses, "count": len(responses)})
+async def get_responses(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    client: Optional[str] = Query(None, description="Client email address"),
+    sentiment: Optional[str] = None,
+    priority: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO date/time, inclusive"),
+    until: Optional[str] = Query(None, description="ISO date/time, exclusive")
+):
+    """Get client responses."""
+    return paged_response(
+        lambda c, n: storage.page_responses(c, n, client=client, sentiment=sentiment, priority=priority,
+                                            since=since, until=until),
+        cursor, limit, format
+    )
 
 
 @app.get("/api/clients")
-async def get_clients():
-    """Get all client context data."""
-    clients = load_json_file(CLIENT_CONTEXT_FILE)
-    return JSONResponse(content={"success": True, "data": clients, "count": len(clients)})
+async def get_clients(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    industry: Optional[str] = None,
+    min_engagement: Optional[float] = None
+):
+    """Get client context data."""
+    return paged_response(
+        lambda c, n: storage.page_clients(c, n, industry=industry, min_engagement=min_engagement),
+        cursor, limit, format
+    )
 
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Get dashboard statistics."""
-    emails = load_json_file(EMAILS_FILE)
-    responses = load_json_file(RESPONSES_FILE)
-    clients = load_json_file(CLIENT_CONTEXT_FILE)
-    
-    total_emails = len(emails)
-    total_responses = len(responses)
-    response_rate = (total_responses / total_emails * 100) if total_emails > 0 else 0
-    
-    engagement_scores = [c.get("engagement_score", 0) for c in clients]
-    avg_engagement = sum(engagement_scores) / len(engagement_scores) if engagement_scores else 0
-    
-    high_priority = sum(1 for r in responses if r.get("priority") == "high")
-    
-    sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
-    for response in responses:
-        sentiment = response.get("sentiment", "neutral")
-        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-    
-    return JSONResponse(content={
-        "success": True,
-        "data": {
-            "total_emails_sent": total_emails,
-            "total_responses": total_responses,
-            "response_rate": round(response_rate, 1),
-            "high_priority_leads": high_priority,
-            "avg_engagement_score": round(avg_engagement, 1),
-            "total_clients": len(clients),
-            "sentiment_distribution": sentiment_counts
-        }
-    })
+    return snapshot_response(request, "stats")
 
 
 @app.get("/api/activity")
-async def get_activity():
-    """Get recent activity timeline."""
-    emails = load_json_file(EMAILS_FILE)
-    responses = load_json_file(RESPONSES_FILE)
-    
-    activity = []
-    
-    for email in emails:
-        activity.append({
+async def get_activity(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    client: Optional[str] = Query(None, description="Client email address"),
+    type: Optional[str] = Query(None, pattern="^(email_sent|response_received)$"),
+    sentiment: Optional[str] = None,
+    priority: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO date/time, inclusive"),
+    until: Optional[str] = Query(None, description="ISO date/time, exclusive")
+):
+    """Get the activity timeline, newest first."""
+    kind = {"email_sent": "email", "response_received": "response"}.get(type)
+    return paged_response(
+        lambda c, n: storage.page_activity(c, n, client=client, kind=kind, sentiment=sentiment,
+                                           priority=priority, since=since, until=until),
+        cursor, limit, format, activity_entry
+    )
+
+
+def activity_entry(item: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Timeline entry for an ("email" | "response", record) pair."""
+    kind, record = item
+    if kind == "email":
+        return {
             "type": "email_sent",
-            "timestamp": email.get("sent_date"),
-            "description": f"Email sent to {email.get('client_name')}",
-            "subject": email.get("subject"),
-            "client": email.get("client_name"),
-            "id": email.get("id")
-        })
-    
-    for response in responses:
-        activity.append({
-            "type": "response_received",
-            "timestamp": response.get("response_date"),
-            "description": f"Response from {response.get('client_name')}",
-            "sentiment": response.get("sentiment"),
-            "priority": response.get("priority"),
-            "client": response.get("client_name"),
-            "id": response.get("id")
-        })
-    
-    activity.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    
-    return JSONResponse(content={"success": True, "data": activity, "count": len(activity)})
+            "timestamp": record.get("sent_date"),
+            "description": f"Email sent to {record.get('client_name')}",
+            "subject": record.get("subject"),
+            "client": record.get("client_name"),
+            "id": record.get("id")
+        }
+    return {
+        "type": "response_received",
+        "timestamp": record.get("response_date"),
+        "description": f"Response from {record.get('client_name')}",
+        "sentiment": record.get("sentiment"),
+        "priority": record.get("priority"),
+        "client": record.get("client_name"),
+        "id": record.get("id")
+    }
 
 
 @app.post("/api/run-analysis")
-async def run_analysis(background_tasks: BackgroundTasks):
-    """Trigger the overnight analysis run (using Multi-Agent System)."""
+async def run_analysis():
+    """Trigger the overnight analysis run (using Multi-Agent System).
+
+    The run executes in a worker process; poll /api/jobs/{job_id} for progress.
+    While a run is active, the existing job is returned instead of starting another.
+    """
     try:
-        # Import the new Agentic System
-        from agentic_system import run_overnight_analysis
-        
-        # Run in background
-        background_tasks.add_task(run_overnight_analysis)
+        job, created = job_manager.submit("run_analysis", "container:run_analysis_job", top_n=8)
         
         return JSONResponse(content={
             "success": True,
-            "message": "Multi-Agent Analysis started in background. Agents: Research → Analysis → Email Writer.",
-            "status": "running",
+            "message": ("Multi-Agent Analysis started in background. Agents: Research → Analysis → Email Writer."
+                        if created else "Multi-Agent Analysis is already running."),
+            "status": job["status"],
+            "job_id": job["id"],
+            "job": job,
             "framework": "LangGraph"
-        })
+        }, status_code=202 if created else 200)
     except Exception as e:
         return JSONResponse(content={
             "success": False,
@@ -321,19 +316,72 @@ async def run_analysis(background_tasks: BackgroundTasks):
         }, status_code=500)
 
 
+@app.get("/api/jobs")
+async def list_jobs(type: Optional[str] = None):
+    """Recent background jobs, newest first."""
+    return {"success": True, "data": job_manager.list_jobs(type)}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress counters and result of a background job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(content={"success": False, "error": "Job not found"}, status_code=404)
+    return {"success": True, "data": job}
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events: a `progress` event on every job update, then `done` when it finishes."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(content={"success": False, "error": "Job not found"}, status_code=404)
+
+    async def events():
+        version = None
+        last_sent = time.monotonic()
+        while True:
+            job = job_manager.get(job_id)
+            if job is None:
+                return
+            finished = job["status"] not in ("queued", "running")
+            if job["version"] != version or finished:
+                version = job["version"]
+                last_sent = time.monotonic()
+                yield f"event: {'done' if finished else 'progress'}\ndata: {json.dumps(job)}\n\n"
+                if finished:
+                    return
+            elif time.monotonic() - last_sent >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(JOB_EVENTS_INTERVAL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.post("/api/ingest-documents")
 async def ingest_documents():
-    """Ingest client documents into RAG system."""
+    """Ingest client documents into RAG system as a background job.
+
+    Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for files done,
+    chunks written and throughput; the per-file chunk counts are the job result.
+    """
     try:
-        from rag_system import ingest_documents
-        
-        results = ingest_documents(str(DOCUMENTS_DIR))
+        job, created = job_manager.submit(
+            "ingest_documents", "container:ingest_job", directory_path=str(DOCUMENTS_DIR)
+        )
         
         return JSONResponse(content={
             "success": True,
-            "message": "Documents ingested successfully",
-            "results": results
-        })
+            "message": "Document ingestion started" if created else "Document ingestion is already running",
+            "status": job["status"],
+            "job_id": job["id"],
+            "job": job
+        }, status_code=202 if created else 200)
     except Exception as e:
         return JSONResponse(content={
             "success": False,
@@ -342,13 +390,10 @@ async def ingest_documents():
 
 
 @app.get("/api/rag-stats")
-async def get_rag_stats():
-    """Get RAG system statistics."""
+def get_rag_stats():
+    """Get RAG system statistics from the ingest manifest."""
     try:
-        from rag_system import RAGSystem
-        
-        rag = RAGSystem()
-        stats = rag.get_stats()
+        stats = container.documents.stats()
         
         return JSONResponse(content={
             "success": True,
@@ -362,6 +407,44 @@ async def get_rag_stats():
         })
 
 
+@app.get("/api/rag-documents")
+def get_rag_documents(client_id: Optional[str] = None):
+    """Ingested documents with their client, chunk counts, sizes and ingest times."""
+    return {"success": True, "data": container.documents.documents(client_id)}
+
+
+@app.get("/api/rag-documents/{source}")
+def get_rag_document(source: str):
+    """Registry entry for one ingested document."""
+    container.documents.refresh()
+    document = container.documents.summary(source)
+    if document is None:
+        return JSONResponse(content={"success": False, "error": "Document not found"}, status_code=404)
+    return {"success": True, "data": document}
+
+
+@app.get("/api/run-metrics")
+async def get_run_metrics():
+    """Per-stage timings (p50/p95), tokens, retries and fallbacks of the last overnight run."""
+    summary = load_summary(DATA_DIR)
+    if summary is None:
+        return JSONResponse(content={"success": False, "error": "No instrumented run yet"}, status_code=404)
+    return {"success": True, "data": summary}
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint: last-run pipeline metrics plus background job counts."""
+    counts: Dict[Tuple[str, str], int] = {}
+    for job in job_manager.list_jobs():
+        key = (job["type"], job["status"])
+        counts[key] = counts.get(key, 0) + 1
+    job_lines = metric_lines("jarvis_jobs", "gauge", "Background jobs known to this API process.",
+                             [("", {"type": t, "status": s}, n) for (t, s), n in sorted(counts.items())])
+    body = prometheus_text(load_summary(DATA_DIR)) + "\n".join(job_lines) + "\n"
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,112 @@
+"""
+Dashboard Endpoint Latency Benchmark
+Generates synthetic emails/responses/clients at increasing sizes and times
+the dashboard API: the first request after a data change (parse + index +
+build) and steady-state requests served from the repository.
+
+Usage: python benchmarks/bench_dashboard.py [--sizes 1000 10000 50000] [--requests 50]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import app as api
+from repository import DataRepository
+
+ENDPOINTS = ["/api/dashboard", "/api/warm-leads", "/api/stats", "/api/activity"]
+
+
+def write_dataset(data_dir: Path, emails: int, seed: int = 5) -> None:
+    """Write emails_sent.json, responses.json and client_context.json."""
+    rng = random.Random(seed)
+    client_count = max(10, emails // 10)
+    clients = [{
+        "client_id": f"C{i:05d}",
+        "name": f"Client {i}",
+        "email": f"client{i}@example.com",
+        "company": f"Company {i}",
+        "industry": rng.choice(["Retail", "Hospitality", "Finance", "Tech"]),
+        "engagement_score": rng.randint(1, 100),
+        "key_insights": ["insight"],
+        "pain_points": ["pain point"]
+    } for i in range(client_count)]
+
+    email_records = []
+    for i in range(emails):
+        client = clients[i % client_count]
+        email_records.append({
+            "id": f"email_{i}",
+            "client_id": client["client_id"],
+            "client_name": client["name"],
+            "client_email": client["email"],
+            "subject": f"Subject {i}",
+            "body": "Body " * 40,
+            "full_content": "Body " * 40,
+            "sent_date": f"2026-01-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+            "priority_score": rng.randint(1, 10)
+        })
+
+    responses = []
+    for i, email in enumerate(rng.sample(email_records, emails // 3)):
+        responses.append({
+            "id": f"resp_{i}",
+            "email_id": email["id"],
+            "client_name": email["client_name"],
+            "client_email": email["client_email"],
+            "response_date": email["sent_date"].replace("T", "T1"),
+            "response_text": "Sounds good, let's talk.",
+            "sentiment": rng.choice(["positive", "neutral", "negative"]),
+            "interest_level": rng.choice(["high", "medium", "low"]),
+            "priority": rng.choice(["high", "medium", "low"]),
+            "next_action": "Call"
+        })
+
+    for name, records in (("emails_sent.json", email_records), ("responses.json", responses),
+                          ("client_context.json", clients)):
+        with open(data_dir / name, 'w') as f:
+            json.dump(records, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    client = TestClient(api.app)
+    print(f"📊 Dashboard latency ({args.requests} warm requests per endpoint)")
+    print(f"\n   {'emails':>8} {'endpoint':<18} {'first':>9} {'warm p50':>10} {'warm p95':>10}")
+
+    for size in args.sizes:
+        data_dir = Path(tempfile.mkdtemp(prefix="jarvis_dashboard_"))
+        write_dataset(data_dir, size)
+        api.repository = DataRepository(data_dir)
+
+        for endpoint in ENDPOINTS:
+            # Touch the data so the first request pays for the rebuild
+            (data_dir / "responses.json").touch()
+            start = time.perf_counter()
+            client.get(endpoint)
+            first = time.perf_counter() - start
+
+            timings = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                client.get(endpoint)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"   {size:>8} {endpoint:<18} {first * 1000:7.1f}ms {statistics.median(timings) * 1000:8.2f}ms {p95 * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Embedding Backend Benchmark
+Compares embeddings/sec, model load time and peak RSS across the embedding
+backends in embeddings.py. Each backend runs in its own subprocess so peak
+memory is measured in isolation.
+
+Usage: python benchmarks/bench_embeddings.py [--texts 2000] [--batch-size 32] [--threads 0]
+       [--backends onnx onnx-int8 chroma-default sentence-transformers]
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BACKEND_DIR))
+
+WORDS = (
+    "pension allowance portfolio mortgage retirement inheritance trust equity dividend "
+    "capital gains property rental income business sale succession planning cashflow "
+    "insurance protection ISA SIPP annuity drawdown valuation probate gift tax relief"
+).split()
+
+
+def make_texts(count: int, seed: int = 11):
+    """Mix of short queries and chunk-sized passages."""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        length = rng.randint(8, 30) if i % 4 == 0 else rng.randint(120, 220)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(length)))
+    return texts
+
+
+def run_backend(backend: str, texts: int, batch_size: int, threads: int) -> dict:
+    """Measure one backend (called inside the child process)."""
+    from embeddings import create_embedding_function, warm_up
+
+    data = make_texts(texts)
+    start = time.perf_counter()
+    embedding_function = create_embedding_function(backend, batch_size=batch_size, threads=threads)
+    warm_up(embedding_function)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embedding_function(data)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "embeddings_per_sec": len(data) / elapsed,
+        # ru_maxrss is reported in KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8", "chroma-default", "sentence-transformers"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.texts, args.batch_size, args.threads)))
+        return
+
+    print(f"🧮 Embedding benchmark: {args.texts} texts, batch size {args.batch_size}, threads {args.threads or 'auto'}")
+    print(f"\n   {'backend':<24} {'load':>8} {'emb/s':>10} {'peak RSS':>10}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--texts", str(args.texts),
+             "--batch-size", str(args.batch_size), "--threads", str(args.threads)],
+            capture_output=True, text=True, cwd=str(BACKEND_DIR)
+        )
+        if proc.returncode != 0:
+            reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"   {backend:<24} skipped: {reason}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"   {backend:<24} {result['load_seconds']:7.2f}s {result['embeddings_per_sec']:10.1f} {result['peak_rss_mb']:8.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Document Ingestion Benchmark
+Generates a synthetic corpus of DOCX files and reports documents/sec and
+chunks/sec for the serial per-file path and the pipelined batch path, plus
+text extraction speed of python-docx versus the streaming extractor.
+
+Usage: python benchmarks/bench_ingest.py [--docs 3000] [--workers 4] [--batch-size 256]
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from docx import Document
+from docx_stream import extract_docx_text
+from rag_system import RAGSystem
+
+
+WORDS = (
+    "pension allowance portfolio mortgage retirement inheritance trust equity dividend "
+    "capital gains property rental income business sale succession planning cashflow "
+    "insurance protection ISA SIPP annuity drawdown valuation probate gift tax relief"
+).split()
+
+
+def generate_corpus(directory: Path, count: int, seed: int = 7) -> None:
+    """Write `count` DOCX files with paragraphs and a small table each."""
+    rng = random.Random(seed)
+    for i in range(count):
+        doc = Document()
+        doc.add_heading(f"Client {i:05d} Financial Summary", level=1)
+        for _ in range(rng.randint(8, 30)):
+            doc.add_paragraph(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))))
+        table = doc.add_table(rows=4, cols=3)
+        for row in table.rows:
+            for cell in row.cells:
+                cell.text = " ".join(rng.choice(WORDS) for _ in range(3))
+        doc.save(directory / f"client_{i:05d}.docx")
+
+
+def extract_with_python_docx(file_path: str) -> str:
+    """The original object-model extraction, kept here as the baseline."""
+    doc = Document(file_path)
+    full_text = [p.text for p in doc.paragraphs if p.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                if cell.text.strip():
+                    full_text.append(cell.text)
+    return "\n".join(full_text)
+
+
+def run_extraction(docs_dir: Path, extractor):
+    files = sorted(docs_dir.glob("*.docx"))
+    start = time.perf_counter()
+    for file_path in files:
+        extractor(str(file_path))
+    return time.perf_counter() - start
+
+
+def run_serial(docs_dir: Path, db_dir: Path):
+    rag = RAGSystem(persist_directory=str(db_dir))
+    chunks = 0
+    start = time.perf_counter()
+    for file_path in sorted(docs_dir.glob("*.docx")):
+        chunks += rag.ingest_document(str(file_path))
+    return time.perf_counter() - start, chunks
+
+
+def run_pipelined(docs_dir: Path, db_dir: Path, workers: int, batch_size: int):
+    rag = RAGSystem(persist_directory=str(db_dir))
+    start = time.perf_counter()
+    results = rag.ingest_directory(str(docs_dir), batch_size=batch_size, workers=workers)
+    return time.perf_counter() - start, sum(results.values())
+
+
+def report(name: str, docs: int, elapsed: float, chunks: int) -> None:
+    print(f"   {name:<28} {elapsed:8.1f}s  {docs / elapsed:8.1f} docs/s  {chunks / elapsed:8.1f} chunks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--skip-serial", action="store_true", help="Only run the pipelined path")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="jarvis_ingest_bench_"))
+    docs_dir = work_dir / "docs"
+    docs_dir.mkdir()
+    try:
+        print(f"📝 Generating {args.docs} DOCX files in {docs_dir}...")
+        generate_corpus(docs_dir, args.docs)
+
+        print("\n📊 Extraction")
+        baseline = run_extraction(docs_dir, extract_with_python_docx)
+        streaming = run_extraction(docs_dir, extract_docx_text)
+        print(f"   {'python-docx':<28} {baseline:8.1f}s  {args.docs / baseline:8.1f} docs/s")
+        print(f"   {'streaming':<28} {streaming:8.1f}s  {args.docs / streaming:8.1f} docs/s  ({baseline / streaming:.1f}x)")
+
+        print("\n📊 Ingestion")
+        if not args.skip_serial:
+            elapsed, chunks = run_serial(docs_dir, work_dir / "db_serial")
+            report("serial ingest_document", args.docs, elapsed, chunks)
+        elapsed, chunks = run_pipelined(docs_dir, work_dir / "db_pipelined", args.workers, args.batch_size)
+        report(f"pipelined (w={args.workers}, b={args.batch_size})", args.docs, elapsed, chunks)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Overnight Pipeline Benchmark
+Runs JarvisAgentSystem.overnight_analysis_run end to end on synthetic client
+books (see synthetic_book.py) with the deterministic FakeChatModel in place of
+Gemini, so it needs no network access or API key.
+
+For each book size it reports ingestion time, pipeline wall time,
+clients/minute, LLM calls, peak memory (max RSS of the process running that
+size) and p50/p95 per workflow stage from the run metrics. Each size runs in
+a fresh process and temporary data directory.
+
+Usage: python benchmarks/bench_pipeline.py [--clients 10 1000 10000] [--latency 0.02]
+       [--concurrency 4] [--doc-fraction 1.0] [--output results.json]
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# The fake model has no quota; keep the client-side limiter out of the measurement
+os.environ.setdefault("JARVIS_LLM_RPM", "1000000")
+os.environ.setdefault("JARVIS_LLM_TPM", "1000000000")
+
+
+def run_size(clients: int, latency: float, jitter: float, concurrency: int, top_n: int,
+             doc_fraction: float, seed: int) -> Dict[str, Any]:
+    """Generate, ingest and analyse one book in this (fresh) process."""
+    from agentic_system import JarvisAgentSystem
+    from fake_llm import FakeChatModel
+    from rag_system import RAGSystem
+    from synthetic_book import generate_book
+
+    work_dir = Path(tempfile.mkdtemp(prefix="jarvis_pipeline_bench_"))
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            book = generate_book(work_dir, clients, seed=seed, doc_fraction=doc_fraction)
+
+            start = time.perf_counter()
+            rag = RAGSystem(persist_directory=str(work_dir / "chroma_db"))
+            rag.ingest_directory(str(work_dir / "client_documents"), clients=book)
+            ingest_seconds = time.perf_counter() - start
+
+            fake = FakeChatModel(latency=latency, jitter=jitter)
+            system = JarvisAgentSystem(rag_system=rag, llm=fake, data_dir=work_dir)
+            start = time.perf_counter()
+            result = system.overnight_analysis_run(top_n=top_n, max_concurrency=concurrency, incremental=False)
+            run_seconds = time.perf_counter() - start
+
+        return {
+            "clients": clients,
+            "documents": rag.get_stats()["total_documents"],
+            "ingest_seconds": round(ingest_seconds, 3),
+            "run_seconds": round(run_seconds, 3),
+            "clients_per_minute": round(clients / run_seconds * 60, 1),
+            "llm_calls": fake.stats["calls"],
+            # Linux reports KiB
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "stages": {name: {"p50": stage["seconds"]["p50"], "p95": stage["seconds"]["p95"],
+                              "total": stage["seconds"]["total"]}
+                       for name, stage in result["metrics"]["stages"].items()}
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake LLM seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency spread, as a fraction")
+    parser.add_argument("--concurrency", type=int, default=None, help="Default: JARVIS_MAX_CONCURRENT_CLIENTS")
+    parser.add_argument("--top-n", type=int, default=8)
+    parser.add_argument("--doc-fraction", type=float, default=1.0, help="Share of clients with a document")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for clients in args.clients:
+        print(f"\n▶ {clients} clients (fake LLM {args.latency * 1000:.0f} ms ± {args.jitter:.0%})")
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(run_size, clients, args.latency, args.jitter, args.concurrency,
+                                 args.top_n, args.doc_fraction, args.seed).result()
+        results.append(result)
+        print(f"   Ingest:     {result['documents']} documents in {result['ingest_seconds']:.1f}s")
+        print(f"   Pipeline:   {result['run_seconds']:.1f}s ({result['clients_per_minute']:.0f} clients/min)")
+        print(f"   LLM calls:  {result['llm_calls']}")
+        print(f"   Peak RSS:   {result['peak_rss_mb']:.0f} MB")
+        for name, stage in result["stages"].items():
+            print(f"   {name:<17} p50 {stage['p50'] * 1000:8.2f}ms  p95 {stage['p95'] * 1000:8.2f}ms  "
+                  f"total {stage['total']:7.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
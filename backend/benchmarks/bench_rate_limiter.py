@@ -0,0 +1,79 @@
+"""
+Rate Limiter Throughput Benchmark
+Drives concurrent callers through RateLimitedLLM against a fake model that
+returns 429s above its quota, and reports sustained throughput offline.
+
+Usage: python benchmarks/bench_rate_limiter.py [--seconds 20] [--workers 8]
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from fake_llm import FakeChatModel
+from rate_limiter import RateLimitedLLM, RateLimiter, RetryPolicy, RetryBudget
+
+
+def run_scenario(name: str, server_rpm: float, client_rpm: float, seconds: float, workers: int, latency: float):
+    """Hammer the fake model for `seconds` and print throughput numbers."""
+    fake = FakeChatModel(latency=latency, requests_per_minute=server_rpm, quota_window=10.0)
+    llm = RateLimitedLLM(
+        fake,
+        RateLimiter(requests_per_minute=client_rpm, tokens_per_minute=10_000_000),
+        RetryPolicy(max_attempts=6, base_delay=0.2, max_delay=5.0),
+        RetryBudget(ratio=0.5, min_retries=20)
+    )
+    done = {"ok": 0, "failed": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        while time.monotonic() < deadline:
+            try:
+                llm.invoke("ANALYSIS TASK: benchmark prompt")
+                key = "ok"
+            except Exception:
+                key = "failed"
+            # Only count calls that completed inside the measurement window
+            if time.monotonic() <= deadline:
+                with lock:
+                    done[key] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = seconds
+
+    print(f"\n▶ {name}")
+    print(f"   Server quota: {server_rpm:.0f} rpm | limiter ceiling: {client_rpm:.0f} rpm")
+    print(f"   Successful calls: {done['ok']} ({done['ok'] / elapsed * 60:.1f}/min)")
+    print(f"   Failed calls:     {done['failed']}")
+    print(f"   429s from server: {fake.stats['rejected']}")
+    print(f"   Retries:          {llm.stats['retries']}")
+    print(f"   Limiter wait:     {llm.limiter.total_wait_seconds:.1f}s total")
+    print(f"   Final rate:       {llm.limiter.fraction * 100:.0f}% of ceiling")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model latency per call (s)")
+    parser.add_argument("--server-rpm", type=float, default=300.0)
+    args = parser.parse_args()
+
+    print("🚦 Rate limiter benchmark (offline, fake LLM)")
+    print("=" * 50)
+    run_scenario("Limiter matches quota", args.server_rpm, args.server_rpm, args.seconds, args.workers, args.latency)
+    run_scenario("Limiter 2x over quota (adaptive backoff)", args.server_rpm, args.server_rpm * 2, args.seconds, args.workers, args.latency)
+    run_scenario("Effectively unthrottled (retries only)", args.server_rpm, 1e9, args.seconds, args.workers, args.latency)
+
+
+if __name__ == "__main__":
+    main()
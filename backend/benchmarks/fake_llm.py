@@ -0,0 +1,110 @@
+"""
+Fake Chat Model for Offline Benchmarks
+Stands in for ChatGoogleGenerativeAI: canned JSON replies, configurable latency
+and a server-side quota that answers with 429 errors when exceeded.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+class QuotaExceededError(Exception):
+    """Mimics the provider's 429 RESOURCE_EXHAUSTED error."""
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("429 RESOURCE_EXHAUSTED: Quota exceeded for requests per minute")
+
+
+class FakeChatModel(Runnable):
+    """Deterministic stand-in for the Gemma chat model."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        requests_per_minute: Optional[float] = None,
+        quota_window: float = 60.0,
+        model: str = "fake-gemma",
+        jitter: float = 0.0
+    ):
+        self.latency = latency
+        # Latency varies by up to +/- jitter (a fraction), fixed per prompt so runs repeat exactly
+        self.jitter = jitter
+        self.requests_per_minute = requests_per_minute
+        # Shorter windows enforce the same rate at a finer grain (handy for quick runs).
+        self.quota_window = quota_window
+        self.model = model
+        self.temperature = 0.7
+        self._window: deque = deque()
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "rejected": 0}
+
+    def _admit(self) -> bool:
+        """Sliding-window quota check."""
+        if self.requests_per_minute is None:
+            return True
+        allowed = max(1, int(self.requests_per_minute * self.quota_window / 60.0))
+        now = time.monotonic()
+        with self._lock:
+            while self._window and now - self._window[0] > self.quota_window:
+                self._window.popleft()
+            if len(self._window) >= allowed:
+                self.stats["rejected"] += 1
+                return False
+            self._window.append(now)
+            return True
+
+    def _latency_for(self, prompt: str) -> float:
+        if not self.jitter:
+            return self.latency
+        unit = int.from_bytes(hashlib.sha256(prompt.encode()).digest()[:4], "big") / 0xFFFFFFFF
+        return self.latency * (1 + self.jitter * (2 * unit - 1))
+
+    def _reply(self, prompt: str) -> str:
+        if "EMAIL GENERATION TASK" in prompt:
+            return json.dumps({
+                "subject": "A quick idea for the year ahead",
+                "body": "Hi there,\n\nI've been reviewing your plans and spotted an opportunity "
+                        "worth a short conversation. Would you have 20 minutes this week?\n\n"
+                        "Best Regards,\nYour Financial Advisor.",
+                "tone": "consultative",
+                "personalization_elements": ["client name", "opportunity type"]
+            })
+        # Derive a stable score from the prompt so rankings are reproducible.
+        score = sum(prompt.encode()) % 10 + 1
+        return "```json\n" + json.dumps({
+            "client_id": "",
+            "client_name": "",
+            "opportunity_type": "Tax Planning",
+            "priority_score": score,
+            "timing_reason": "Tax year end is approaching",
+            "approach_angle": "Use remaining allowances before April",
+            "estimated_value": "£5k-£10k annual saving",
+            "key_insights": ["Income above the additional-rate threshold"]
+        }) + "\n```"
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        prompt = input.to_string() if hasattr(input, "to_string") else str(input)
+        with self._lock:
+            self.stats["calls"] += 1
+        if not self._admit():
+            raise QuotaExceededError()
+        if self.latency:
+            time.sleep(self._latency_for(prompt))
+        content = self._reply(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        )
@@ -0,0 +1,157 @@
+"""
+Synthetic Client Book
+Writes a data directory shaped like backend/data: client_context.json with N
+client records and client_documents/ with one DOCX per client, named after
+the client so ingestion maps each document to its owner. Output depends only
+on the count, seed and reference date.
+
+Usage: python benchmarks/synthetic_book.py --clients 1000 --out /tmp/jarvis_book [--doc-fraction 1.0]
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from docx import Document
+
+
+FIRST_NAMES = (
+    "Olivia Amelia Isla Ava Mia Ivy Lily Isabella Rosie Sophia Grace Freya Willow Florence Emily Ella "
+    "Oliver George Noah Arthur Muhammad Leo Harry Oscar Archie Henry Theodore Freddie Jack Charlie "
+    "Thomas Finley Alfie Lucas Isaac Edward Priya Anika Ravi Chen"
+).split()
+LAST_NAMES = (
+    "Smith Jones Taylor Brown Williams Wilson Johnson Davies Robinson Wright Thompson Evans Walker White "
+    "Roberts Green Hall Wood Jackson Clarke Patel Khan Lewis James Phillips Mason Mitchell Rose Davis "
+    "Rodriguez Cox Alexander Morgan Moore Martin Price Hughes Turner Harris Cooper Ward Morris King "
+    "Baker Hart Fraser Hussain Singh Okafor Nguyen"
+).split()
+MIDDLE_INITIALS = "ABCDEFGHJKLMNPRSTW"
+
+INDUSTRIES = (
+    "Hospitality", "Retail", "Construction", "Software", "Healthcare", "Manufacturing",
+    "Professional Services", "Real Estate", "Agriculture", "Logistics", "Education", "Media"
+)
+COMPANY_SUFFIXES = ("Ltd", "Holdings", "& Co", "Group", "Partners", "Enterprises")
+SIZES = ("Sole Trader", "Small Business", "Medium Business", "Family Office")
+REVENUES = ("£80k", "£150k", "£280k", "£650k", "£1.2M", "£3.5M", "£9M")
+
+INSIGHTS = (
+    "Net worth of {worth} with property making up most of it",
+    "Planning to retire within {years} years",
+    "Recently sold a rental property in {town}",
+    "Two children at university with fees paid from savings",
+    "Holds a legacy workplace pension that has not been reviewed",
+    "Considering passing the business to the next generation",
+    "Cash balances well above the emergency fund target",
+    "Expecting a bonus of {bonus} this tax year",
+)
+PAIN_POINTS = (
+    "Worried about inheritance tax on the family home",
+    "Unsure whether to draw down or buy an annuity",
+    "Mortgage fix ends this year and rates have risen",
+    "Business sale valuation below expectations",
+    "Not using ISA and pension allowances each year",
+    "Stress from managing rental properties directly",
+    "Capital gains tax bill expected on share disposal",
+    "No protection cover in place for the main earner",
+)
+TOWNS = ("Bath", "Leeds", "Bristol", "Norwich", "York", "Exeter", "Brighton", "Chester")
+
+WORDS = (
+    "pension allowance portfolio mortgage retirement inheritance trust equity dividend "
+    "capital gains property rental income business sale succession planning cashflow "
+    "insurance protection ISA SIPP annuity drawdown valuation probate gift tax relief"
+).split()
+
+
+def client_names(count: int, rng: random.Random) -> List[str]:
+    """`count` distinct "First M. Last" names."""
+    combos = len(FIRST_NAMES) * len(MIDDLE_INITIALS) * len(LAST_NAMES)
+    if count > combos:
+        raise ValueError(f"At most {combos} distinct client names can be generated")
+    names = []
+    for n in rng.sample(range(combos), count):
+        n, first = divmod(n, len(FIRST_NAMES))
+        last, middle = divmod(n, len(MIDDLE_INITIALS))
+        names.append(f"{FIRST_NAMES[first]} {MIDDLE_INITIALS[middle]}. {LAST_NAMES[last]}")
+    return names
+
+
+def make_client(i: int, name: str, rng: random.Random, as_of: date) -> Dict[str, Any]:
+    last_name = name.split()[-1]
+    return {
+        "client_id": f"client_{i:06d}",
+        "name": name,
+        "email": f"{name.lower().replace('. ', '.').replace(' ', '.')}.{i}@example.com",
+        "company": f"{last_name} {rng.choice(COMPANY_SUFFIXES)}",
+        "industry": rng.choice(INDUSTRIES),
+        "revenue_range": rng.choice(REVENUES),
+        "company_size": rng.choice(SIZES),
+        "key_insights": [
+            insight.format(worth=f"£{rng.randint(3, 60) / 10:.1f}M", years=rng.randint(1, 10),
+                           town=rng.choice(TOWNS), bonus=f"£{rng.randint(10, 200)}k")
+            for insight in rng.sample(INSIGHTS, rng.randint(2, 4))
+        ],
+        "pain_points": rng.sample(PAIN_POINTS, rng.randint(1, 3)),
+        "engagement_score": rng.randint(10, 98),
+        "last_interaction": (as_of - timedelta(days=rng.randint(0, 365))).isoformat()
+    }
+
+
+def write_document(path: Path, client: Dict[str, Any], rng: random.Random) -> None:
+    """A fact-find style document: profile paragraphs, client notes and a holdings table."""
+    doc = Document()
+    doc.add_heading(f"{client['name']} - Financial Summary", level=1)
+    doc.add_paragraph(f"{client['name']} runs {client['company']} in {client['industry'].lower()} "
+                      f"with revenue of {client['revenue_range']}.")
+    for line in client["key_insights"] + client["pain_points"]:
+        doc.add_paragraph(line + ". " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))))
+    for _ in range(rng.randint(4, 16)):
+        doc.add_paragraph(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))))
+    table = doc.add_table(rows=4, cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = " ".join(rng.choice(WORDS) for _ in range(3))
+    doc.save(path)
+
+
+def generate_book(data_dir: Path, count: int, seed: int = 7, doc_fraction: float = 1.0,
+                  as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Write client_context.json and client_documents/ for `count` clients; returns the clients.
+
+    `doc_fraction` of the clients (chosen at random) get a document.
+    """
+    rng = random.Random(seed)
+    as_of = as_of or date.today()
+    data_dir = Path(data_dir)
+    documents_dir = data_dir / "client_documents"
+    documents_dir.mkdir(parents=True, exist_ok=True)
+
+    clients = [make_client(i, name, rng, as_of) for i, name in enumerate(client_names(count, rng))]
+    with open(data_dir / "client_context.json", "w") as f:
+        json.dump(clients, f, indent=2)
+
+    for client in clients:
+        if rng.random() < doc_fraction:
+            write_document(documents_dir / f"{client['name']}.docx", client, rng)
+    return clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--out", required=True, help="Data directory to write")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--doc-fraction", type=float, default=1.0, help="Share of clients with a document")
+    args = parser.parse_args()
+
+    clients = generate_book(Path(args.out), args.clients, args.seed, args.doc_fraction)
+    documents = len(list((Path(args.out) / "client_documents").glob("*.docx")))
+    print(f"✅ Wrote {len(clients)} clients and {documents} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
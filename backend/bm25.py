@@ -0,0 +1,164 @@
+"""
+BM25 Keyword Index
+SQLite FTS5 inverted index over the chunk texts, kept in step with the
+ChromaDB collection. Exact terms that embeddings blur, such as client names,
+are matched lexically and ranked with BM25, then fused with the vector
+ranking by reciprocal rank. Small per-client chunk sets are scored in memory
+with score_documents instead.
+"""
+import math
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# BM25 column weights: the document title (file name) counts more than body text
+TITLE_WEIGHT = 3.0
+CONTENT_WEIGHT = 1.0
+
+# Okapi BM25 parameters for in-memory scoring (FTS5 uses the same defaults)
+K1 = 1.2
+B = 0.75
+
+
+def match_expression(query: str) -> str:
+    """FTS5 query matching any of the query's terms, each quoted literally."""
+    terms = dict.fromkeys(t.lower() for t in TOKEN.findall(query))
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def score_documents(query: str, documents: Sequence[str]) -> List[float]:
+    """Okapi BM25 score of each document for the query, with IDF over `documents` only."""
+    terms = set(t.lower() for t in TOKEN.findall(query))
+    if not terms or not documents:
+        return [0.0] * len(documents)
+
+    frequencies = []
+    lengths = []
+    document_counts: Dict[str, int] = {}
+    for document in documents:
+        tokens = [t.lower() for t in TOKEN.findall(document)]
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            if token in terms:
+                counts[token] = counts.get(token, 0) + 1
+        for term in counts:
+            document_counts[term] = document_counts.get(term, 0) + 1
+        frequencies.append(counts)
+        lengths.append(len(tokens))
+
+    total = len(documents)
+    average_length = (sum(lengths) / total) or 1.0
+    idf = {term: math.log(1 + (total - n + 0.5) / (n + 0.5)) for term, n in document_counts.items()}
+    return [
+        sum(idf[term] * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average_length))
+            for term, tf in counts.items())
+        for counts, length in zip(frequencies, lengths)
+    ]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum of 1 / (k + rank) over the lists it appears in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Chunk id -> (title, content) full-text index with BM25 ranking."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                source TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_source ON chunks(source)")
+        self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunk_terms
+            USING fts5(title, content, tokenize = 'unicode61 remove_diacritics 2')
+        """)
+        self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Index chunks, replacing any existing entries with the same ids."""
+        with self._lock, self._conn:
+            self._delete_ids(ids)
+            for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                source = metadata.get("source", "")
+                rowid = self._conn.execute(
+                    "INSERT INTO chunks (chunk_id, source) VALUES (?, ?)", (chunk_id, source)
+                ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO chunk_terms (rowid, title, content) VALUES (?, ?, ?)",
+                    (rowid, Path(source).stem, document)
+                )
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._delete_ids(ids)
+
+    def delete_source(self, source: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM chunk_terms WHERE rowid IN (SELECT rowid FROM chunks WHERE source = ?)", (source,)
+            )
+            self._conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunk_terms")
+            self._conn.execute("DELETE FROM chunks")
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            marks = ",".join("?" * len(batch))
+            self._conn.execute(
+                f"DELETE FROM chunk_terms WHERE rowid IN (SELECT rowid FROM chunks WHERE chunk_id IN ({marks}))", batch
+            )
+            self._conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({marks})", batch)
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Best-matching (chunk_id, score) pairs, highest score first."""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT c.chunk_id, bm25(chunk_terms, ?, ?) AS rank
+                FROM chunk_terms JOIN chunks c ON c.rowid = chunk_terms.rowid
+                WHERE chunk_terms MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (TITLE_WEIGHT, CONTENT_WEIGHT, expression, limit)
+            ).fetchall()
+        # FTS5 reports BM25 negated (lower is better)
+        return [(chunk_id, -rank) for chunk_id, rank in rows]
+
+    def search_many(self, queries: List[str], limit: int = 20) -> List[List[Tuple[str, float]]]:
+        return [self.search(query, limit) for query in queries]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
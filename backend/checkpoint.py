@@ -0,0 +1,158 @@
+"""
+Run Checkpointing
+Streaming selection and crash-safe progress for the overnight run. TopN keeps
+only the best opportunities seen so far in a bounded min-heap, and
+RunCheckpoint appends every scored client and written email to a JSONL log,
+so an interrupted run resumes where it stopped instead of starting over.
+"""
+import hashlib
+import heapq
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+
+# Set JARVIS_RUN_CHECKPOINT=off to always start runs from scratch
+CHECKPOINT_ENABLED = os.getenv("JARVIS_RUN_CHECKPOINT", "on").lower() not in ("0", "off", "false")
+
+CHECKPOINT_FILE = "run_checkpoint.jsonl"
+
+
+class TopN:
+    """The `capacity` highest-keyed items pushed so far, in O(capacity) memory.
+
+    Ties go to the item with the lower `order`, like a stable sort of the
+    items in that order.
+    """
+
+    def __init__(self, capacity: int, key: Callable[[Any], Any]):
+        self.capacity = capacity
+        self.key = key
+        self._heap: List[Tuple[Any, int, Any]] = []
+
+    def push(self, item: Any, order: int) -> None:
+        entry = (self.key(item), -order, item)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        """Kept items, best first."""
+        return [item for _key, _order, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def run_key(clients: List[Dict[str, Any]], top_n: int) -> str:
+    """Identifies a run's inputs; a checkpoint only resumes a run with the same key."""
+    digest = hashlib.sha256(f"{top_n}\x00".encode("utf-8"))
+    for client in clients:
+        digest.update(json.dumps(client, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class RunCheckpoint:
+    """Append-only JSONL log of one run: a header line, then "scored" and "email" records.
+
+    Each record is flushed and fsynced before the next client starts, so a
+    crash loses at most the clients that were in flight. Use it as a context
+    manager so the log is closed even when the run fails.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self, key: str) -> Tuple[Set[str], Dict[str, Dict[str, Any]]]:
+        """Resume the logged run if it has this key, else start a new log.
+
+        Returns the ids of clients already scored and the emails already
+        written, by client id; scored records are read back with scored().
+        """
+        scored_ids: Set[str] = set()
+        emails: Dict[str, Dict[str, Any]] = {}
+        resumed = False
+        intact = 0
+        for record, intact in self._records():
+            if record["type"] == "run":
+                if record["key"] != key:
+                    break
+                resumed = True
+            elif record["type"] == "scored":
+                scored_ids.add(record["client_id"])
+            elif record["type"] == "email":
+                emails[record["client_id"]] = record["result"]
+
+        if not resumed:
+            scored_ids, emails = set(), {}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append({"type": "run", "key": key})
+        else:
+            # Drop a record cut short by the crash before appending after it
+            os.truncate(self.path, intact)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return scored_ids, emails
+
+    def scored(self) -> Iterator[Dict[str, Any]]:
+        """Scored records of the logged run, streamed from disk."""
+        for record, _ in self._records():
+            if record["type"] == "scored":
+                yield record["scored"]
+
+    def add_scored(self, client_id: str, scored: Dict[str, Any]) -> None:
+        self._append({"type": "scored", "client_id": client_id, "scored": scored})
+
+    def add_email(self, client_id: str, result: Dict[str, Any]) -> None:
+        self._append({"type": "email", "client_id": client_id, "result": result})
+
+    def complete(self) -> None:
+        """The run's results are saved: the log is no longer needed."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close the log but keep it on disk, so the run can still be resumed."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "RunCheckpoint":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _records(self) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """(record, byte offset just after it), up to the first incomplete line."""
+        try:
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        return
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+                    offset += len(line)
+                    yield record, offset
+        except FileNotFoundError:
+            return
@@ -0,0 +1,167 @@
+"""
+Structure-Aware Document Chunking
+Packs paragraphs and table rows into chunks sized by embedding-model tokens,
+never splitting a block unless it is larger than a chunk on its own. Each
+chunk carries the heading of the section it came from.
+"""
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# all-MiniLM-L6-v2 reads at most 256 tokens including [CLS]/[SEP]
+CHUNK_TOKENS = int(os.getenv("JARVIS_CHUNK_TOKENS", "250"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("JARVIS_CHUNK_OVERLAP_TOKENS", "32"))
+
+# Bump when chunk boundaries change so the ingest manifest re-chunks every file
+CHUNKER_VERSION = "blocks-v1"
+
+# Block = (kind, text, style) as produced by docx_stream.iter_docx_blocks
+Block = Tuple[str, str, str]
+
+UNDERLINE = re.compile(r"^\s*([=\-_~*])\1{2,}\s*$")
+SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def is_heading_style(style: str) -> bool:
+    return style.lower().startswith(("heading", "title"))
+
+
+def _mark_headings(blocks: Iterable[Block]) -> List[Tuple[str, str]]:
+    """Reduce blocks to (kind, text) with kind "heading", "paragraph" or "table_row".
+
+    Besides Heading/Title styles, a plain paragraph followed by an
+    "=====" or "-----" underline is treated as a heading.
+    """
+    marked: List[Tuple[str, str]] = []
+    for kind, text, style in blocks:
+        text = text.strip()
+        if not text:
+            continue
+        if kind == "paragraph" and UNDERLINE.match(text):
+            if marked and marked[-1][0] == "paragraph":
+                marked[-1] = ("heading", marked[-1][1])
+            continue
+        if kind == "paragraph" and is_heading_style(style):
+            kind = "heading"
+        marked.append((kind, text))
+    return marked
+
+
+def _split_oversized(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """Split a single block that exceeds max_tokens at sentence, then word, boundaries."""
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for sentence in (s for s in SENTENCE_END.split(text) if s.strip()):
+        sentence_tokens = count_tokens(sentence)
+        if sentence_tokens > max_tokens:
+            # No usable sentence boundary: fall back to words
+            words = sentence.split()
+            units = [" ".join(words[i:i + 16]) for i in range(0, len(words), 16)]
+        else:
+            units = [sentence]
+
+        for unit in units:
+            unit_tokens = sentence_tokens if len(units) == 1 else count_tokens(unit)
+            if current and current_tokens + unit_tokens > max_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += unit_tokens
+
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_blocks(
+    blocks: Iterable[Block],
+    count_tokens: Callable[[str], int],
+    max_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+) -> List[Dict[str, object]]:
+    """Pack document blocks into chunks of at most max_tokens tokens.
+
+    A heading starts a new chunk and is repeated at the top of every chunk in
+    its section. When a table spans several chunks its first row is repeated
+    as a header. Up to overlap_tokens of trailing whole blocks are carried
+    into the next chunk of the same section.
+
+    Returns dicts with "text", "section", "kind" (text/table/mixed) and
+    "token_count".
+    """
+    chunks: List[Dict[str, object]] = []
+    section = ""
+    section_tokens = 0
+    current: List[Tuple[str, str, int]] = []  # (kind, text, tokens)
+    current_tokens = 0
+    table_header: Tuple[str, int] | None = None
+    previous_kind = ""
+
+    def flush(carry: bool) -> None:
+        nonlocal current, current_tokens
+        if not current:
+            return
+        body = [text for _kind, text, _tokens in current]
+        kinds = {kind for kind, _text, _tokens in current}
+        chunks.append({
+            "text": "\n".join(([section] if section else []) + body),
+            "section": section,
+            "kind": "table" if kinds == {"table_row"} else "text" if "table_row" not in kinds else "mixed",
+            "token_count": section_tokens + current_tokens
+        })
+
+        kept: List[Tuple[str, str, int]] = []
+        kept_tokens = 0
+        if carry:
+            for block in reversed(current):
+                if kept_tokens + block[2] > overlap_tokens:
+                    break
+                kept.insert(0, block)
+                kept_tokens += block[2]
+        current, current_tokens = kept, kept_tokens
+
+    for kind, text in _mark_headings(blocks):
+        if kind == "heading":
+            flush(carry=False)
+            section = text
+            section_tokens = count_tokens(section) + 1
+            table_header = None
+            previous_kind = kind
+            continue
+
+        if kind == "table_row" and previous_kind != "table_row":
+            table_header = None
+        previous_kind = kind
+
+        budget = max(1, max_tokens - section_tokens)
+        tokens = count_tokens(text)
+        pieces = [(text, tokens)] if tokens <= budget else [
+            (piece, count_tokens(piece)) for piece in _split_oversized(text, budget, count_tokens)
+        ]
+
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > budget:
+                flush(carry=True)
+                # Drop carried blocks that would not leave room for this one
+                while current and current_tokens + piece_tokens > budget:
+                    current_tokens -= current.pop(0)[2]
+                if (kind == "table_row" and table_header and table_header[0] != piece
+                        and not any(t == table_header[0] for _k, t, _n in current)
+                        and current_tokens + table_header[1] + piece_tokens <= budget):
+                    current.insert(0, ("table_row", table_header[0], table_header[1]))
+                    current_tokens += table_header[1]
+            current.append((kind, piece, piece_tokens))
+            current_tokens += piece_tokens
+
+        if kind == "table_row" and table_header is None:
+            table_header = (text, tokens)
+
+    flush(carry=False)
+    return chunks
+
+
+def text_to_blocks(text: str) -> List[Block]:
+    """Treat each non-empty line of plain text as a paragraph block."""
+    return [("paragraph", line, "") for line in text.splitlines() if line.strip()]
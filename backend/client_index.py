@@ -0,0 +1,45 @@
+"""
+Document-to-Client Mapping
+Resolves which client a document belongs to from its file name, matched
+against the client records (e.g. "Rodney  Trotter.docx" -> Rodney Trotter,
+"ALAN & LYNNE Partridge.docx" -> Alan & Lynne Partridge).
+"""
+import re
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional
+
+WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def name_tokens(name: str) -> FrozenSet[str]:
+    return frozenset(w.lower() for w in WORD.findall(name))
+
+
+class ClientIndex:
+    """Maps document sources to client ids.
+
+    A file matches a client when its name has exactly the client's name
+    words; failing that, when one set of words contains the other and only a
+    single client qualifies (so "Partridge.docx" maps only if no other
+    client is called Partridge). Unmatched documents map to "".
+    """
+
+    def __init__(self, clients: List[Dict[str, Any]]):
+        self._exact: Dict[FrozenSet[str], Optional[str]] = {}
+        self._names: List[tuple] = []
+        for client in clients:
+            tokens = name_tokens(client.get("name", ""))
+            if not tokens:
+                continue
+            # Two clients with the same name: neither can be resolved safely
+            self._exact[tokens] = None if tokens in self._exact else client["client_id"]
+            self._names.append((tokens, client["client_id"]))
+
+    def resolve(self, source: str) -> str:
+        tokens = name_tokens(Path(source).stem)
+        if not tokens:
+            return ""
+        if tokens in self._exact:
+            return self._exact[tokens] or ""
+        matches = {client_id for names, client_id in self._names if tokens <= names or names <= tokens}
+        return matches.pop() if len(matches) == 1 else ""
@@ -0,0 +1,127 @@
+"""
+Application Container
+Builds the expensive components once per process (ChromaDB client, embedding
+model, LLM client and the compiled LangGraph workflow) and shares them between
+API endpoints and background jobs.
+
+The API process only reads document stats, from the ingest manifest, and never
+opens the vector store or loads the embedding model. Analysis and ingestion
+jobs run in the job worker process, whose container is warmed when the worker
+starts. That worker is therefore the only process that writes vectors or
+searches them.
+"""
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ingest_manifest import MANIFEST_FILE, IngestManifest
+from storage import get_storage
+
+
+DATA_DIR = Path(__file__).parent / "data"
+DOCUMENTS_DIR = DATA_DIR / "client_documents"
+CHROMA_DIR = DATA_DIR / "chroma_db"
+
+
+class AppContainer:
+    """Lazily built, process-wide RAG system and agent system."""
+
+    def __init__(self, persist_directory: Optional[str] = None):
+        self.persist_directory = persist_directory
+        self._lock = threading.RLock()
+        self._rag = None
+        self._agent_system = None
+        self._documents: Optional[IngestManifest] = None
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+
+    @property
+    def documents(self) -> IngestManifest:
+        """Ingest manifest of the vector store, re-read when another process saves it."""
+        with self._lock:
+            if self._documents is None:
+                self._documents = IngestManifest(Path(self.persist_directory or CHROMA_DIR) / MANIFEST_FILE)
+            return self._documents
+
+    @property
+    def rag(self):
+        """ChromaDB client and collection with the warmed embedding model."""
+        with self._lock:
+            if self._rag is None:
+                # Imported here so the API process never loads ChromaDB or the embedding model
+                from rag_system import RAGSystem
+                self._rag = RAGSystem(self.persist_directory, storage=get_storage(DATA_DIR))
+                self._manifest_stamp = self._stat_manifest()
+            return self._rag
+
+    @property
+    def agent_system(self):
+        """LLM client and compiled workflow, sharing this container's RAG system."""
+        with self._lock:
+            if self._agent_system is None:
+                # Imported here so the API process never loads the LLM stack
+                from agentic_system import JarvisAgentSystem
+                self._agent_system = JarvisAgentSystem(rag_system=self.rag)
+            return self._agent_system
+
+    def warm_up(self, *components: str) -> None:
+        """Build the named components ("rag", "agent_system") now rather than on first use."""
+        for name in components:
+            getattr(self, name)
+
+    def refresh_rag(self) -> None:
+        """Reload the vector store if another process (e.g. ingest.py) ingested since the last look."""
+        with self._lock:
+            if self._rag is not None and self._stat_manifest() != self._manifest_stamp:
+                print("🔄 Documents were ingested by another process, reloading the vector store")
+                self._rag.reload()
+                self._manifest_stamp = self._stat_manifest()
+
+    def ingest(self, directory_path: str,
+               progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, int]:
+        """Ingest a directory with the shared RAG system."""
+        self.refresh_rag()
+        results = self.rag.ingest_directory(directory_path, progress=progress)
+        with self._lock:
+            self._manifest_stamp = self._stat_manifest()
+        return results
+
+    def _stat_manifest(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._rag.manifest.path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+
+@lru_cache(maxsize=None)
+def get_container() -> AppContainer:
+    """The process-wide container."""
+    return AppContainer()
+
+
+# ----------------------------------------------------------------------------
+# Job worker entry points (see jobs.JobManager)
+# ----------------------------------------------------------------------------
+
+def warm_worker() -> None:
+    """Worker initializer: build everything a job needs before the first job arrives."""
+    try:
+        get_container().warm_up("rag", "agent_system")
+        print("🔥 Job worker warmed up (vector store, embedding model, LLM client, workflow)")
+    except Exception as e:
+        # The job that needs the component will build it and report the error
+        print(f"⚠️ Job worker warm-up failed: {e}")
+
+
+def run_analysis_job(progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     top_n: int = 8) -> Dict[str, Any]:
+    container = get_container()
+    container.refresh_rag()
+    return container.agent_system.overnight_analysis_run(top_n=top_n, progress=progress)
+
+
+def ingest_job(progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+               directory_path: str = str(DOCUMENTS_DIR)) -> Dict[str, int]:
+    return get_container().ingest(directory_path, progress)
@@ -0,0 +1,261 @@
+"""
+Materialized Dashboard View
+Keeps the /api/dashboard and /api/stats payloads pre-serialized in memory,
+with ETags. New runs and new responses written through the storage are
+applied incrementally; changes made by other processes are picked up by a
+throttled version check. A request costs a dictionary lookup.
+"""
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage import Storage
+
+
+# How often to check the storage for writes made by other processes
+DASHBOARD_REFRESH_SECONDS = float(os.getenv("JARVIS_DASHBOARD_REFRESH_SECONDS", "1"))
+
+PRIORITY_ORDER = {"high": 3, "medium": 2, "low": 1}
+
+# (body, etag)
+Snapshot = Tuple[bytes, str]
+
+
+def serialize(content: Any) -> bytes:
+    """Encode like FastAPI's JSONResponse."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def warm_lead_entry(response: Dict[str, Any], email: Dict[str, Any], client: Dict[str, Any]) -> Dict[str, Any]:
+    """Dashboard card for a response joined to its email and client."""
+    return {
+        "id": response["id"],
+        "client_name": response["client_name"],
+        "client_email": response["client_email"],
+        "company": client.get("company", ""),
+        "industry": client.get("industry", ""),
+        "email_subject": email.get("subject", ""),
+        "email_sent": email.get("sent_date", ""),
+        "response_received": response.get("response_date", ""),
+        "response_text": response.get("response_text", ""),
+        "sentiment": response.get("sentiment", "neutral"),
+        "interest_level": response.get("interest_level", "medium"),
+        "priority": response.get("priority", "medium"),
+        "next_action": response.get("next_action", "Follow up"),
+        "engagement_score": client.get("engagement_score", 0),
+        "email_body": email.get("full_content") or email.get("body", ""),
+        "context": {
+            "key_insights": client.get("key_insights", []),
+            "pain_points": client.get("pain_points", [])
+        }
+    }
+
+
+def email_activity(email: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "email_sent",
+        "timestamp": email.get("sent_date", ""),
+        "description": f"Sent email to {email.get('client_name', 'Unknown')}",
+        "client": email.get("client_name", ""),
+        "subject": email.get("subject", ""),
+        "id": email.get("id"),
+        "full_content": email.get("full_content") or email.get("body", "")
+    }
+
+
+def response_activity(response: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "response_received",
+        "timestamp": response.get("response_date", ""),
+        "description": f"Response from {response.get('client_name', 'Unknown')}",
+        "client": response.get("client_name", ""),
+        "sentiment": response.get("sentiment", "neutral"),
+        "response_text": response.get("response_text", ""),
+        "id": response.get("id")
+    }
+
+
+class DashboardView:
+    """Incrementally maintained dashboard and stats payloads for one Storage.
+
+    Warm leads and response activity are kept in sorted lists (ascending
+    keys, read from the end) so new responses are inserted with bisect
+    rather than re-sorting everything. A stored response that is updated in
+    place, or new clients, trigger a full rebuild.
+    """
+
+    def __init__(self, storage: Storage, refresh_seconds: float = DASHBOARD_REFRESH_SECONDS):
+        self.storage = storage
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._version: Any = None
+        self._checked_at = 0.0
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._seq = 0
+        storage.subscribe(self._on_write)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, name: str) -> Snapshot:
+        """Current (body, etag) for "dashboard" or "stats"."""
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.refresh_seconds:
+            self._checked_at = now
+            version = self.storage.refresh()
+            if version != self._version:
+                with self._lock:
+                    if version != self._version:
+                        self._rebuild(version)
+        return self._snapshots[name]
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _rebuild(self, version: Any) -> None:
+        """Recompute every component from storage."""
+        metrics = self.storage.metrics()
+        self._total_emails = metrics["total_emails"]
+        self._total_clients = metrics["total_clients"]
+        self._avg_engagement = metrics["avg_engagement_score"]
+        self._last_sent = metrics["last_sent_date"]
+        self._set_emails(self.storage.current_emails())
+
+        self._response_ids: set = set()
+        self._total_responses = 0
+        self._high_priority = 0
+        self._sentiment_counts: Dict[str, int] = {}
+        self._activity_keys: List[Tuple[str, int]] = []
+        self._activity: List[Dict[str, Any]] = []
+        for response in self.storage.list_responses():
+            self._add_response_stats(response)
+        self._rebuild_warm_leads()
+
+        self._version = version
+        self._publish()
+
+    def _set_emails(self, emails: List[Dict[str, Any]]) -> None:
+        self._top_opportunities = emails[:10]
+        self._email_activity = [email_activity(e) for e in emails[-10:]]
+
+    def _add_response_stats(self, response: Dict[str, Any]) -> None:
+        """Count a new response and insert it into the activity timeline."""
+        self._seq += 1
+        self._response_ids.add(response.get("id"))
+        self._total_responses += 1
+        if response.get("priority") == "high":
+            self._high_priority += 1
+        sentiment = response.get("sentiment", "neutral")
+        self._sentiment_counts[sentiment] = self._sentiment_counts.get(sentiment, 0) + 1
+
+        # Newest first when read from the end; ties keep arrival order
+        key = (response.get("response_date", ""), -self._seq)
+        index = bisect.bisect(self._activity_keys, key)
+        self._activity_keys.insert(index, key)
+        self._activity.insert(index, response_activity(response))
+
+    def _rebuild_warm_leads(self) -> None:
+        self._lead_keys: List[Tuple[int, Any, int]] = []
+        self._leads: List[Dict[str, Any]] = []
+        for response, email, client in self.storage.responses_with_context(email_fallback=True):
+            self._add_warm_lead(response, email, client)
+
+    def _add_warm_lead(self, response: Dict[str, Any], email: Optional[Dict[str, Any]],
+                       client: Optional[Dict[str, Any]]) -> None:
+        if not (email and client):
+            return
+        self._seq += 1
+        lead = warm_lead_entry(response, email, client)
+        # Highest priority, then engagement, first when read from the end
+        key = (PRIORITY_ORDER.get(lead["priority"], 0), lead["engagement_score"], -self._seq)
+        index = bisect.bisect(self._lead_keys, key)
+        self._lead_keys.insert(index, key)
+        self._leads.insert(index, lead)
+
+    def _on_write(self, kind: str, records: List[Dict[str, Any]]) -> None:
+        """Apply a write made through the storage, incrementally where possible."""
+        with self._lock:
+            previous = self._version
+            version = self.storage.refresh()
+            if previous is None:
+                return  # nothing built yet; the next read builds from scratch
+
+            incremental = kind in ("run", "responses") and version == previous + 1
+            if kind == "responses" and any(r.get("id") in self._response_ids for r in records):
+                incremental = False  # an existing response changed
+            if not incremental:
+                self._rebuild(version)
+                return
+
+            if kind == "run":
+                self._total_emails = len(records)
+                self._last_sent = records[-1]["sent_date"] if records else None
+                self._set_emails(records)
+                # Fallback joins point at the current run's emails
+                self._rebuild_warm_leads()
+            else:
+                ids = [r["id"] for r in records]
+                for response, email, client in self.storage.responses_with_context(email_fallback=True, ids=ids):
+                    self._add_response_stats(response)
+                    self._add_warm_lead(response, email, client)
+
+            self._version = version
+            self._publish()
+
+    def _publish(self) -> None:
+        """Assemble and serialize the payloads from the maintained components."""
+        total_emails = self._total_emails
+        total_responses = self._total_responses
+        response_rate = (total_responses / total_emails * 100) if total_emails > 0 else 0
+
+        # Last 10 emails plus the newest responses, newest first (emails win ties)
+        recent_activity = self._email_activity + self._activity[:-16:-1]
+        recent_activity.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+
+        dashboard = {
+            "success": True,
+            "data": {
+                "metrics": {
+                    "emails_sent_today": total_emails,
+                    "responses_received": total_responses,
+                    "response_rate": response_rate,
+                    "warm_leads_count": len(self._leads),
+                    "total_clients": self._total_clients
+                },
+                "last_analyzed": self._last_sent,
+                "warm_leads": self._leads[:-11:-1],
+                "recent_activity": recent_activity[:15],
+                "top_opportunities": self._top_opportunities
+            }
+        }
+
+        sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
+        sentiment_counts.update(self._sentiment_counts)
+        stats = {
+            "success": True,
+            "data": {
+                "total_emails_sent": total_emails,
+                "total_responses": total_responses,
+                "response_rate": round(response_rate, 1),
+                "high_priority_leads": self._high_priority,
+                "avg_engagement_score": round(self._avg_engagement, 1),
+                "total_clients": self._total_clients,
+                "sentiment_distribution": sentiment_counts
+            }
+        }
+
+        snapshots = {}
+        for name, content in (("dashboard", dashboard), ("stats", stats)):
+            body = serialize(content)
+            snapshots[name] = (body, make_etag(body))
+        self._snapshots = snapshots
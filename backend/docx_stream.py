@@ -0,0 +1,136 @@
+"""
+Streaming DOCX Text Extraction
+Reads word/document.xml straight out of the zip with an incremental XML
+parser instead of building the full python-docx object model.
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Tuple
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+P, R, T, TAB, BR, CR = W + "p", W + "r", W + "t", W + "tab", W + "br", W + "cr"
+TBL, TR, TC, VMERGE = W + "tbl", W + "tr", W + "tc", W + "vMerge"
+BODY = W + "body"
+PSTYLE, TXBX = W + "pStyle", W + "txbxContent"
+
+# Block = (kind, text, style): kind is "paragraph" or "table_row"
+Block = Tuple[str, str, str]
+
+
+def _iter_elements(file_path: str) -> Iterator[Tuple[str, object, str]]:
+    """Yield ("paragraph", text, style) and ("table_row", [cell texts], "") in document order.
+
+    Vertically merged continuation cells are skipped so merged text appears
+    once. Parsed elements are cleared as soon as they are consumed, which
+    keeps memory bounded regardless of file size.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("word/document.xml") as xml_stream:
+            table_depth = 0
+            run_depth = 0
+            skip_depth = 0  # inside text boxes (python-docx ignores these too)
+            paragraphs: List[List[str]] = []
+            styles: List[str] = []
+            cells: List[Tuple[List[str], bool]] = []
+            rows: List[List[str]] = []
+            body = None
+
+            for event, elem in ET.iterparse(xml_stream, events=("start", "end")):
+                tag = elem.tag
+
+                if event == "start":
+                    if tag == TXBX:
+                        skip_depth += 1
+                    elif skip_depth:
+                        continue
+                    elif tag == BODY:
+                        body = elem
+                    elif tag == P:
+                        paragraphs.append([])
+                        styles.append("")
+                    elif tag == R:
+                        run_depth += 1
+                    elif tag == TBL:
+                        table_depth += 1
+                    elif tag == TR:
+                        rows.append([])
+                    elif tag == TC:
+                        cells.append(([], False))
+                    continue
+
+                # end events
+                if tag == TXBX:
+                    skip_depth -= 1
+                    continue
+                if skip_depth:
+                    continue
+
+                if tag == T and run_depth and paragraphs:
+                    paragraphs[-1].append(elem.text or "")
+                elif tag == TAB and run_depth and paragraphs:
+                    paragraphs[-1].append("\t")
+                elif tag in (BR, CR) and run_depth and paragraphs:
+                    paragraphs[-1].append("\n")
+                elif tag == R:
+                    run_depth -= 1
+                elif tag == PSTYLE and styles:
+                    styles[-1] = elem.get(W + "val", "")
+                elif tag == VMERGE and cells:
+                    # <w:vMerge/> or val="continue" marks a continuation of the cell above
+                    if elem.get(W + "val", "continue") == "continue":
+                        cells[-1] = (cells[-1][0], True)
+                elif tag == P:
+                    text = "".join(paragraphs.pop())
+                    style = styles.pop()
+                    if cells:
+                        cells[-1][0].append(text)
+                    elif not table_depth and text.strip():
+                        yield ("paragraph", text, style)
+                    elem.clear()
+                    if not table_depth and body is not None:
+                        # Detach finished top-level blocks so the tree never grows
+                        del body[:]
+                elif tag == TC:
+                    cell_paragraphs, merged = cells.pop()
+                    text = "\n".join(cell_paragraphs)
+                    if rows and not merged and text.strip():
+                        rows[-1].append(text)
+                elif tag == TR:
+                    row = rows.pop()
+                    if table_depth > 1 and cells:
+                        # Nested table: fold the row into the enclosing cell
+                        if row:
+                            cells[-1][0].append(" | ".join(row))
+                    elif row:
+                        yield ("table_row", row, "")
+                    elem.clear()
+                elif tag == TBL:
+                    table_depth -= 1
+                    elem.clear()
+                    if not table_depth and body is not None:
+                        del body[:]
+
+
+def iter_docx_blocks(file_path: str) -> Iterator[Block]:
+    """Yield top-level paragraphs and table rows in document order.
+
+    Paragraph style ids (e.g. "Heading1") are reported so callers can track
+    sections; table rows are returned as their cells joined with " | ".
+    """
+    for kind, content, style in _iter_elements(file_path):
+        if kind == "table_row":
+            content = " | ".join(content)
+        yield (kind, content, style)
+
+
+def extract_docx_text(file_path: str) -> str:
+    """Extract body paragraphs followed by table cell text, one item per line."""
+    paragraph_lines: List[str] = []
+    table_lines: List[str] = []
+    for kind, content, _style in _iter_elements(file_path):
+        if kind == "paragraph":
+            paragraph_lines.append(content)
+        else:
+            table_lines.extend(content)
+    return "\n".join(paragraph_lines + table_lines)
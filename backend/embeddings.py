@@ -0,0 +1,207 @@
+"""
+Embedding Backends for the RAG System
+Explicit, configurable embedding functions for all-MiniLM-L6-v2, tuned for
+CPU-only hosts. Every backend produces 384-dim normalized vectors from the
+same model, so they can be swapped without re-ingesting (int8 vectors differ
+slightly from fp32; re-ingest for best recall after switching).
+
+Backends:
+    onnx                   ONNX Runtime, dynamic padding, configurable threads (default)
+    onnx-int8              as above with a dynamically int8-quantized model
+    chroma-default         ChromaDB's stock ONNX function (pads every input to 256 tokens)
+    sentence-transformers  PyTorch via sentence-transformers (optional dependency)
+"""
+import os
+import re
+import threading
+from functools import cached_property, lru_cache
+from typing import Any, Callable, List
+
+import numpy as np
+from chromadb.utils import embedding_functions
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+from tokenizers import Tokenizer
+
+
+EMBEDDING_BACKEND = os.getenv("JARVIS_EMBEDDING_BACKEND", "onnx")
+EMBEDDING_BATCH_SIZE = int(os.getenv("JARVIS_EMBEDDING_BATCH_SIZE", "32"))
+# 0 lets the runtime pick (one thread per physical core)
+EMBEDDING_THREADS = int(os.getenv("JARVIS_EMBEDDING_THREADS", "0"))
+EMBEDDING_WARMUP = os.getenv("JARVIS_EMBEDDING_WARMUP", "on").lower() not in ("0", "off", "false")
+
+BACKENDS = ("onnx", "onnx-int8", "chroma-default", "sentence-transformers")
+
+# Input length the model was trained with (sentence-transformers' max_seq_length)
+MAX_SEQUENCE_TOKENS = 256
+
+
+class OnnxEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """all-MiniLM-L6-v2 on ONNX Runtime, tuned for CPU inference.
+
+    Compared with the stock ChromaDB function, batches are length-sorted and
+    padded only to their longest member (not 256 tokens), the intra-op thread
+    count is configurable, and an int8 dynamically quantized copy of the
+    model can be used.
+    """
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE, threads: int = EMBEDDING_THREADS, quantize: bool = False):
+        super().__init__(preferred_providers=["CPUExecutionProvider"])
+        self.batch_size = batch_size
+        self.threads = threads
+        self.quantize = quantize
+        self._session_lock = threading.Lock()
+
+    @cached_property
+    def tokenizer(self) -> Tokenizer:
+        tokenizer = load_tokenizer(self)
+        tokenizer.enable_truncation(max_length=MAX_SEQUENCE_TOKENS)
+        # Pad to the longest sequence in each batch instead of a fixed 256
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        return tokenizer
+
+    def _model_path(self) -> str:
+        model_dir = os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        if not self.quantize:
+            return fp32_path
+
+        int8_path = os.path.join(model_dir, "model.int8.onnx")
+        if not os.path.exists(int8_path):
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError:
+                raise ValueError("The onnx-int8 backend needs `pip install onnx` to quantize the model")
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        return int8_path
+
+    @cached_property
+    def model(self) -> Any:
+        options = self.ort.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        return self.ort.InferenceSession(self._model_path(), providers=self._preferred_providers, sess_options=options)
+
+    def _forward(self, documents: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        # Sort by length so each batch holds similarly sized inputs
+        order = sorted(range(len(documents)), key=lambda i: len(documents[i]))
+        output = np.zeros((len(documents), 384), dtype=np.float32)
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            encoded = self.tokenizer.encode_batch([documents[i] for i in indices])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            last_hidden_state = self.model.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+
+            # Mean pooling with attention weighting
+            mask = attention_mask[..., np.newaxis].astype(np.float32)
+            pooled = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            output[indices] = self._normalize(pooled)
+
+        return output
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        if not input:
+            return []
+        # Model download and session creation happen once, even under concurrent first calls
+        with self._session_lock:
+            self._download_model_if_not_exists()
+            _ = self.model
+        return list(self._forward(list(input), batch_size=self.batch_size))
+
+
+class SentenceTransformerEmbedding:
+    """all-MiniLM-L6-v2 through sentence-transformers/PyTorch on CPU."""
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE, threads: int = EMBEDDING_THREADS):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ValueError(
+                "The sentence-transformers backend needs `pip install sentence-transformers`"
+            )
+        if threads > 0:
+            torch.set_num_threads(threads)
+        self.batch_size = batch_size
+        self.model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        if not input:
+            return []
+        vectors = self.model.encode(list(input), batch_size=self.batch_size, normalize_embeddings=True)
+        return list(vectors.astype(np.float32))
+
+
+def create_embedding_function(
+    backend: str = EMBEDDING_BACKEND,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    threads: int = EMBEDDING_THREADS
+):
+    """Build a new embedding function for the given backend."""
+    if backend == "onnx":
+        return OnnxEmbeddingFunction(batch_size=batch_size, threads=threads)
+    if backend == "onnx-int8":
+        return OnnxEmbeddingFunction(batch_size=batch_size, threads=threads, quantize=True)
+    if backend == "chroma-default":
+        return embedding_functions.DefaultEmbeddingFunction()
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedding(batch_size=batch_size, threads=threads)
+    raise ValueError(f"Unknown embedding backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+
+
+def load_tokenizer(embedding_function: ONNXMiniLM_L6_V2) -> Tokenizer:
+    """A fresh copy of the model's tokenizer.json, downloading the model if needed."""
+    embedding_function._download_model_if_not_exists()
+    return Tokenizer.from_file(os.path.join(
+        embedding_function.DOWNLOAD_PATH, embedding_function.EXTRACTED_FOLDER_NAME, "tokenizer.json"
+    ))
+
+
+def get_token_counter(embedding_function) -> Callable[[str], int]:
+    """Count tokens with the embedding model's own tokenizer (untruncated).
+
+    Falls back to a word/punctuation estimate for backends that do not
+    expose a tokenizer.
+    """
+    tokenizer = None
+    if isinstance(embedding_function, ONNXMiniLM_L6_V2):
+        tokenizer = load_tokenizer(embedding_function)
+    elif isinstance(embedding_function, SentenceTransformerEmbedding):
+        tokenizer = embedding_function.model.tokenizer.backend_tokenizer
+        tokenizer = type(tokenizer).from_str(tokenizer.to_str())
+
+    if tokenizer is None:
+        return lambda text: len(re.findall(r"\w+|[^\w\s]", text))
+
+    tokenizer.no_truncation()
+    tokenizer.no_padding()
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def warm_up(embedding_function) -> None:
+    """Load the model and run one inference so the first real call is fast."""
+    embedding_function(["warm-up"])
+
+
+@lru_cache(maxsize=None)
+def get_embedding_function(
+    backend: str = EMBEDDING_BACKEND,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    threads: int = EMBEDDING_THREADS
+):
+    """Process-wide shared embedding function, warmed up on first use."""
+    embedding_function = create_embedding_function(backend, batch_size, threads)
+    if EMBEDDING_WARMUP:
+        try:
+            warm_up(embedding_function)
+        except Exception as e:
+            print(f"⚠️ Embedding warm-up failed ({backend}): {e}")
+    return embedding_function
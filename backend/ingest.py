@@ -12,7 +12,8 @@ backend_dir = current_dir
 sys.path.append(str(backend_dir))
 
 try:
-    from rag_system import ingest_documents, RAGSystem
+    from rag_system import RAGSystem
+    from storage import get_storage
 except ImportError as e:
     print(f"❌ Error importing rag_system: {e}")
     sys.exit(1)
@@ -45,36 +46,15 @@ def run_ingestion():
 
     print(f"📄 Found {len(files)} documents to ingest.")
     
-    # Run ingestion with size check
+    # Run ingestion (unchanged files are skipped via the ingest manifest)
     try:
-        total_processed = 0
-        total_skipped = 0
+        rag = RAGSystem(str(db_dir), storage=get_storage(current_dir / "data"))
+        results = rag.ingest_directory(str(docs_dir))
         
-        # Override process to add size check (using internal method effectively)
-        # Or better: filter files before passing to library if possible.
-        # But library takes a directory. 
-        # Let's iterate files manually and call ingest_document one by one
-        
-        rag = RAGSystem()
-        
-        for file_path in files:
-            # Check size
-            size_mb = file_path.stat().st_size / (1024 * 1024)
-            if size_mb > 5.0:
-                print(f"⚠️ Skipping large file ({size_mb:.1f}MB): {file_path.name}")
-                total_skipped += 1
-                continue
-                
-            print(f"Processing: {file_path.name}...")
-            rag.ingest_document(str(file_path))
-            total_processed += 1
-            
         print("\n✅ Ingestion Complete!")
-        print(f"   Processed {total_processed} files")
-        print(f"   Skipped {total_skipped} large files")
+        print(f"   Processed {len(results)} files")
         
         # Verify
-        rag = RAGSystem()
         stats = rag.get_stats()
         print(f"\n📊 System Stats:")
         print(f"   Total Chunks in DB: {stats['total_chunks']}")
@@ -0,0 +1,138 @@
+"""
+Ingestion Manifest
+Records what has been ingested per source file (mtime, size, content hash and
+chunk ids) so re-ingestion can skip unchanged files and clean up stale chunks,
+and answers document statistics without touching the vector store.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+# Kept next to the vector store it describes
+MANIFEST_FILE = "ingest_manifest.json"
+
+
+def file_sha256(file_path: str) -> str:
+    """Content hash of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """JSON-backed map of source name -> ingestion record.
+
+    Also serves as the source registry for stats: totals of chunks and bytes
+    are kept up to date as entries are set and removed, so they are read in
+    constant time rather than by scanning the vector store. `by_client` maps
+    each client_id to its sources, the per-client partition used by search.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.stamp: Optional[Tuple[int, int]] = None
+        self._load()
+
+    def _load(self) -> None:
+        self.stamp = self._stat()
+        try:
+            with open(self.path, 'r') as f:
+                self.entries: Dict[str, Dict[str, Any]] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+        self.total_chunks = sum(len(e.get("chunk_ids", [])) for e in self.entries.values())
+        self.total_bytes = sum(e.get("size", 0) for e in self.entries.values())
+        self.updated_at = max((e.get("ingested_at", "") for e in self.entries.values()), default=None)
+        self.by_client: Dict[str, Set[str]] = {}
+        for source, entry in self.entries.items():
+            self.by_client.setdefault(entry.get("client_id", ""), set()).add(source)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def refresh(self) -> bool:
+        """Reload if another process saved the manifest; returns True when reloaded."""
+        if self._stat() == self.stamp:
+            return False
+        self._load()
+        return True
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(source)
+
+    def set(self, source: str, entry: Dict[str, Any]) -> None:
+        self._untrack(source, self.entries.get(source))
+        self.entries[source] = entry
+        self.by_client.setdefault(entry.get("client_id", ""), set()).add(source)
+        self.total_chunks += len(entry.get("chunk_ids", []))
+        self.total_bytes += entry.get("size", 0)
+        self.updated_at = datetime.now().isoformat()
+
+    def remove(self, source: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.pop(source, None)
+        if entry:
+            self._untrack(source, entry)
+            self.updated_at = datetime.now().isoformat()
+        return entry
+
+    def _untrack(self, source: str, entry: Optional[Dict[str, Any]]) -> None:
+        if entry:
+            self.by_client.get(entry.get("client_id", ""), set()).discard(source)
+            self.total_chunks -= len(entry.get("chunk_ids", []))
+            self.total_bytes -= entry.get("size", 0)
+
+    def client_chunk_ids(self, client_id: str) -> List[str]:
+        """Chunk ids of every document mapped to client_id."""
+        return [chunk_id for source in sorted(self.by_client.get(client_id, ()))
+                for chunk_id in self.entries[source].get("chunk_ids", [])]
+
+    def summary(self, source: str) -> Optional[Dict[str, Any]]:
+        """Registry view of one source: client, chunk count, bytes and ingest time."""
+        entry = self.entries.get(source)
+        if entry is None:
+            return None
+        return {
+            "source": source,
+            "client_id": entry.get("client_id", ""),
+            "chunks": len(entry.get("chunk_ids", [])),
+            "bytes": entry.get("size", 0),
+            "ingested_at": entry.get("ingested_at"),
+            "modified_at": datetime.fromtimestamp(entry["mtime"]).isoformat() if "mtime" in entry else None,
+            "sha256": entry.get("sha256")
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Document and chunk totals, in constant time; re-reads the file only if it changed."""
+        self.refresh()
+        return {
+            "total_chunks": self.total_chunks,
+            "total_documents": len(self.entries),
+            "total_bytes": self.total_bytes,
+            "last_ingested_at": self.updated_at,
+            "sources": list(self.entries)
+        }
+
+    def documents(self, client_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Registry view of every source, or only those mapped to client_id."""
+        self.refresh()
+        return [self.summary(source) for source, entry in self.entries.items()
+                if client_id is None or entry.get("client_id", "") == client_id]
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        tmp_path.replace(self.path)
+        self.stamp = self._stat()
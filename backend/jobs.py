@@ -0,0 +1,270 @@
+"""
+Background Job Manager
+Runs long operations (the overnight analysis, document ingestion) in a
+separate, long-lived worker process and tracks them by job id. Only one job of
+each type runs at a time, and the job reports progress counters that the API
+serves while it runs.
+"""
+import importlib
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+
+# Finished jobs kept in memory for GET /api/jobs/{id}
+JOB_HISTORY = int(os.getenv("JARVIS_JOB_HISTORY", "100"))
+
+ACTIVE_STATES = ("queued", "running")
+
+# "module:function" resolved in the worker, so the web process never imports it
+Target = Union[str, Callable[..., Any]]
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _resolve(target: Target) -> Callable[..., Any]:
+    if callable(target):
+        return target
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class JobLockedError(RuntimeError):
+    """Another process already holds the lock for this job type."""
+
+
+class _FileLock:
+    """Non-blocking exclusive flock, so separate API workers or a CLI run cannot overlap."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if self.path is None or fcntl is None:
+            return self
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            raise JobLockedError(f"Another process is already running this job ({self.path.name})")
+        return self
+
+    def __exit__(self, *exc):
+        if self._file:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def _init_worker(queue, initializer: Optional[Target]) -> None:
+    global _progress_queue
+    _progress_queue = queue
+    if initializer:
+        _resolve(initializer)()
+
+
+def _ready() -> bool:
+    return True
+
+
+def _run_in_worker(job_id: str, target: Target, kwargs: Dict[str, Any], lock_path: Optional[Path]) -> Any:
+    """Entry point in the worker process: run the target, streaming progress back."""
+    def progress(update: Dict[str, Any]) -> None:
+        _progress_queue.put((job_id, update))
+
+    with _FileLock(lock_path):
+        _progress_queue.put((job_id, {"status": "running", "started_at": _now()}))
+        return _resolve(target)(progress=progress, **kwargs)
+
+
+class JobManager:
+    """Submits jobs to a worker process and keeps their status.
+
+    `initializer` runs once in each worker process when it starts, so work
+    that every job needs (loading models, opening clients) is paid for once.
+    A job record is a plain dict: id, type, status (queued/running/succeeded/
+    failed), timestamps, a `progress` dict updated by the job, and `result`
+    or `error` once it finishes. Every change bumps the job's `version`, so
+    watchers can tell when there is something new to send.
+    """
+
+    def __init__(self, lock_dir: Optional[Path] = None, max_workers: int = 1,
+                 initializer: Optional[Target] = None):
+        self.lock_dir = Path(lock_dir) if lock_dir else None
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active: Dict[str, str] = {}  # job type -> running job id
+        self._context = multiprocessing.get_context("spawn")
+        self._queue = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._listener: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker process now, so its initializer runs before the first job."""
+        with self._lock:
+            pool = self._get_pool()
+        pool.submit(_ready)
+
+    def submit(self, job_type: str, target: Target, **kwargs: Any) -> Tuple[Dict[str, Any], bool]:
+        """Start a job of job_type unless one is already active.
+
+        `target` is called in the worker process as target(progress=..., **kwargs).
+        Jobs of different types queue for the worker in submission order.
+        Returns (job, created); when a job of this type is still queued or
+        running, that job is returned with created=False.
+        """
+        with self._lock:
+            active_id = self._active.get(job_type)
+            if active_id and self._jobs[active_id]["status"] in ACTIVE_STATES:
+                return self._copy(self._jobs[active_id]), False
+
+            job_id = f"{job_type}_{uuid.uuid4().hex[:12]}"
+            job = {
+                "id": job_id,
+                "type": job_type,
+                "status": "queued",
+                "created_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {},
+                "result": None,
+                "error": None,
+                "version": 0
+            }
+            self._jobs[job_id] = job
+            self._active[job_type] = job_id
+            self._trim()
+
+            lock_path = self.lock_dir / f"{job_type}.lock" if self.lock_dir else None
+            future = self._get_pool().submit(_run_in_worker, job_id, target, kwargs, lock_path)
+            snapshot = self._copy(job)
+
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return snapshot, True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._copy(job) if job else None
+
+    def list_jobs(self, job_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Known jobs, newest first."""
+        with self._lock:
+            return [self._copy(job) for job in reversed(self._jobs.values())
+                    if job_type is None or job["type"] == job_type]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._queue is not None:
+            self._queue.put(None)
+            self._queue = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Worker pool, started on first use (and again if a worker died)."""
+        if self._pool is None:
+            if self._queue is None:
+                self._queue = self._context.Queue()
+                self._listener = threading.Thread(target=self._listen, name="jarvis-job-progress", daemon=True)
+                self._listener.start()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=self._context,
+                initializer=_init_worker, initargs=(self._queue, self.initializer)
+            )
+        return self._pool
+
+    def _listen(self) -> None:
+        """Apply progress messages sent by workers."""
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            self._apply(*message)
+
+    def _apply(self, job_id: str, update: Dict[str, Any]) -> None:
+        """Record a status or progress update from a running job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            if "status" not in update:
+                job["progress"].update(update)
+            elif job["status"] in ACTIVE_STATES:
+                # Progress can trail the result; never move a finished job back
+                job["status"] = update["status"]
+                job["started_at"] = update.get("started_at")
+            job["version"] += 1
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        error = None
+        result = None
+        try:
+            result = future.result()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if type(e).__name__ == "BrokenProcessPool":
+                with self._lock:
+                    self._pool = None
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["status"] = "failed" if error else "succeeded"
+            job["finished_at"] = _now()
+            job["result"] = result
+            job["error"] = error
+            job["version"] += 1
+            if self._active.get(job["type"]) == job_id:
+                del self._active[job["type"]]
+
+        if error:
+            print(f"❌ Job {job_id} failed: {error}")
+        else:
+            print(f"✅ Job {job_id} finished")
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs beyond JOB_HISTORY."""
+        excess = len(self._jobs) - JOB_HISTORY
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id]["status"] not in ACTIVE_STATES:
+                del self._jobs[job_id]
+                excess -= 1
+
+    @staticmethod
+    def _copy(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {**job, "progress": dict(job["progress"])}
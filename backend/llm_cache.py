@@ -0,0 +1,152 @@
+"""
+Persistent LLM Response Cache
+SQLite-backed cache keyed on (model, temperature, rendered prompt) fingerprints
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from metrics import record
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("JARVIS_LLM_CACHE_TTL_HOURS", "168")) * 3600
+DEFAULT_MAX_BYTES = int(float(os.getenv("JARVIS_LLM_CACHE_MAX_MB", "100")) * 1024 * 1024)
+
+
+def prompt_fingerprint(model: str, temperature: Optional[float], prompt: str) -> str:
+    """Stable cache key for a rendered prompt."""
+    payload = f"{model}\x00{temperature}\x00{prompt}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class LLMCache:
+    """Disk-backed response cache with TTL expiry and size-bounded LRU eviction."""
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self._conn.commit()
+        self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the per-run hit/miss counters."""
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached content for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, size, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            content, size, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.total_bytes -= size
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats["hits"] += 1
+            return content
+
+    def set(self, key: str, content: str) -> None:
+        """Store content under key, evicting least-recently-used entries beyond max_bytes."""
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.total_bytes -= row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, content, size, now, now)
+            )
+            self.total_bytes += size
+            self.stats["writes"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used rows until the cache fits in max_bytes."""
+        while self.total_bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 100").fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total_bytes -= size
+                self.stats["evictions"] += 1
+                if self.total_bytes <= self.max_bytes:
+                    return
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry; returns the number removed."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            freed = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses WHERE created_at < ?", (cutoff,)).fetchone()[0]
+            removed = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+            self.total_bytes -= freed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-run counters plus current cache size."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "size_bytes": self.total_bytes
+        }
+
+
+class CachedLLM(Runnable):
+    """Runnable that answers from an LLMCache before delegating to the wrapped model."""
+
+    def __init__(self, llm: Runnable, cache: LLMCache, model: str, temperature: Optional[float]):
+        self.llm = llm
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        prompt = input.to_string() if hasattr(input, "to_string") else str(input)
+        key = prompt_fingerprint(self.model, self.temperature, prompt)
+
+        content = self.cache.get(key)
+        if content is not None:
+            record(cache_hits=1)
+            return AIMessage(content=content, response_metadata={"cache_hit": True})
+
+        response = self.llm.invoke(input, config, **kwargs)
+        if isinstance(response.content, str) and response.content:
+            self.cache.set(key, response.content)
+        return response
@@ -0,0 +1,208 @@
+"""
+Pipeline Metrics
+Per-client, per-stage measurements of the overnight run: wall time, RAG and
+LLM latency, prompt/completion tokens, retries, cache hits and fallbacks.
+
+Each workflow node runs inside RunMetrics.stage(), which makes its sample the
+current one for that thread; the LLM wrappers and agents add to it with
+record(), so they need no reference to the run. The per-run summary (p50/p95
+per stage) is saved next to the other data files, where the API process
+serves it in Prometheus text format.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+RUN_METRICS_FILE = "run_metrics.json"
+CLIENT_METRICS_FILE = "run_metrics_clients.jsonl"
+
+# Fields of every stage sample; the *_seconds ones get percentiles in the summary
+COUNTERS = ("llm_calls", "prompt_tokens", "completion_tokens", "retries", "rate_limit_wait_seconds",
+            "cache_hits", "fallbacks")
+TIMINGS = ("seconds", "rag_seconds", "llm_seconds")
+
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar("jarvis_stage_sample", default=None)
+
+
+def record(**values: float) -> None:
+    """Add to the current stage's sample; a no-op outside an instrumented stage."""
+    sample = _current.get()
+    if sample is not None:
+        for key, value in values.items():
+            sample[key] = sample.get(key, 0) + value
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class RunMetrics:
+    """Stage samples of one run: {stage: [{client_id, seconds, llm_seconds, ...}]}."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples: Dict[str, List[Dict[str, Any]]] = {}
+            self.started_at = datetime.now(timezone.utc).isoformat()
+
+    @contextmanager
+    def stage(self, name: str, client_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Time a stage; record() calls made inside it land in its sample."""
+        sample: Dict[str, Any] = {"client_id": client_id, **{key: 0 for key in TIMINGS + COUNTERS}}
+        token = _current.set(sample)
+        start = time.perf_counter()
+        try:
+            yield sample
+        finally:
+            sample["seconds"] = time.perf_counter() - start
+            _current.reset(token)
+            with self._lock:
+                self.samples.setdefault(name, []).append(sample)
+
+    def instrument(self, name: str, node: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+        """Wrap a workflow node so each call is recorded as a stage of the state's client."""
+        def instrumented(state: Dict[str, Any]) -> Any:
+            with self.stage(name, state["client"]["client_id"]):
+                return node(state)
+        instrumented.__name__ = getattr(node, "__name__", name)
+        return instrumented
+
+    def summary(self) -> Dict[str, Any]:
+        """p50/p95/mean/total of each timing and totals of each counter, per stage and overall."""
+        with self._lock:
+            samples = {name: list(rows) for name, rows in self.samples.items()}
+
+        stages = {}
+        for name, rows in samples.items():
+            stage: Dict[str, Any] = {"count": len(rows)}
+            for key in TIMINGS:
+                values = sorted(row[key] for row in rows)
+                stage[key] = {
+                    "p50": round(percentile(values, 0.5), 6),
+                    "p95": round(percentile(values, 0.95), 6),
+                    "mean": round(sum(values) / len(values), 6),
+                    "total": round(sum(values), 6)
+                }
+            for key in COUNTERS:
+                stage[key] = round(sum(row[key] for row in rows), 6)
+            stages[name] = stage
+
+        return {
+            "started_at": self.started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "clients": len({row["client_id"] for rows in samples.values() for row in rows if row["client_id"]}),
+            "stages": stages,
+            "totals": {key: round(sum(stage[key] for stage in stages.values()), 6) for key in COUNTERS}
+        }
+
+    def clients(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-client breakdown: {client_id: {stage: sample}}."""
+        with self._lock:
+            rows = [(name, row) for name, stage_rows in self.samples.items() for row in stage_rows]
+        breakdown: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for name, row in rows:
+            if row["client_id"]:
+                breakdown.setdefault(row["client_id"], {})[name] = {
+                    key: round(value, 6) for key, value in row.items() if key != "client_id"
+                }
+        return breakdown
+
+    def save(self, data_dir: Path) -> Dict[str, Any]:
+        """Write the summary and the per-client breakdown; returns the summary."""
+        data_dir = Path(data_dir)
+        summary = self.summary()
+        _write_atomic(data_dir / RUN_METRICS_FILE, json.dumps(summary, indent=2))
+        _write_atomic(data_dir / CLIENT_METRICS_FILE, "".join(
+            json.dumps({"client_id": client_id, "stages": stages}) + "\n"
+            for client_id, stages in self.clients().items()
+        ))
+        return summary
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    tmp_path.replace(path)
+
+
+def load_summary(data_dir: Path) -> Optional[Dict[str, Any]]:
+    """The last saved run summary, or None before the first instrumented run."""
+    try:
+        with open(Path(data_dir) / RUN_METRICS_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# ----------------------------------------------------------------------------
+# Prometheus text exposition
+# ----------------------------------------------------------------------------
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def metric_lines(name: str, kind: str, help_text: str,
+                 samples: List[Tuple[str, Dict[str, Any], float]]) -> List[str]:
+    """HELP/TYPE header plus one line per (suffix, labels, value) sample."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{suffix}{_labels(labels)} {_value(value)}" for suffix, labels, value in samples)
+    return lines
+
+
+def _value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def prometheus_text(summary: Optional[Dict[str, Any]]) -> str:
+    """Render a run summary as Prometheus gauges and summaries (values describe the last run)."""
+    if not summary:
+        return ""
+    stages = summary["stages"]
+    lines: List[str] = []
+
+    finished = datetime.fromisoformat(summary["finished_at"]).timestamp()
+    lines += metric_lines("jarvis_last_run_timestamp_seconds", "gauge",
+                          "When the last instrumented overnight run finished.", [("", {}, finished)])
+    lines += metric_lines("jarvis_last_run_clients", "gauge",
+                          "Clients processed by the last run.", [("", {}, summary["clients"])])
+
+    for key, help_text in (("seconds", "Wall time per client of each workflow stage."),
+                           ("rag_seconds", "Document search time per client of each stage."),
+                           ("llm_seconds", "LLM call time (including rate-limit waits and retries) per client of each stage.")):
+        name = "jarvis_last_run_stage_" + key
+        samples = []
+        for stage, values in stages.items():
+            samples += [("", {"stage": stage, "quantile": "0.5"}, values[key]["p50"]),
+                        ("", {"stage": stage, "quantile": "0.95"}, values[key]["p95"]),
+                        ("_sum", {"stage": stage}, values[key]["total"]),
+                        ("_count", {"stage": stage}, values["count"])]
+        lines += metric_lines(name, "summary", help_text, samples)
+
+    for key, help_text in (("llm_calls", "LLM requests sent to the provider."),
+                           ("prompt_tokens", "Prompt tokens reported by the provider."),
+                           ("completion_tokens", "Completion tokens reported by the provider."),
+                           ("retries", "LLM retries after throttling or transient errors."),
+                           ("rate_limit_wait_seconds", "Time spent waiting on the client-side rate limiter."),
+                           ("cache_hits", "LLM calls answered from the response cache."),
+                           ("fallbacks", "Agent steps that fell back to a default result.")):
+        lines += metric_lines("jarvis_last_run_" + key, "gauge", help_text,
+                              [("", {"stage": stage}, values[key]) for stage, values in stages.items()])
+
+    return "\n".join(lines) + "\n"
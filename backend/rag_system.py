@@ -4,25 +4,76 @@ Ingests DOCX files and creates embeddings for semantic search
 """
 import os
 import json
+import time
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import chromadb
+import numpy as np
 from chromadb.config import Settings
-from docx import Document
+from docx_stream import extract_docx_text, iter_docx_blocks
 from datetime import datetime
+from ingest_manifest import MANIFEST_FILE, IngestManifest, file_sha256
+from embeddings import get_embedding_function, get_token_counter
+from chunking import CHUNK_OVERLAP_TOKENS, CHUNK_TOKENS, CHUNKER_VERSION, Block, chunk_blocks, text_to_blocks
+from bm25 import BM25Index, reciprocal_rank_fusion, score_documents
+from client_index import ClientIndex
+from storage import Storage, get_storage
+
+
+# Pipelined ingestion defaults: extraction processes and chunks per embedding batch
+DEFAULT_INGEST_WORKERS = int(os.getenv("JARVIS_INGEST_WORKERS", str(os.cpu_count() or 1)))
+DEFAULT_EMBED_BATCH_SIZE = int(os.getenv("JARVIS_EMBED_BATCH_SIZE", "256"))
+
+# Number of query embeddings kept in the in-memory LRU cache
+QUERY_CACHE_SIZE = int(os.getenv("JARVIS_QUERY_CACHE_SIZE", "4096"))
+
+# Retrieval: "hybrid" fuses BM25 and vector rankings, "vector" or "keyword" use one alone
+RETRIEVAL_MODE = os.getenv("JARVIS_RETRIEVAL", "hybrid").lower()
+# Candidates taken from each ranking before fusion, and the RRF rank constant
+RETRIEVAL_CANDIDATES = int(os.getenv("JARVIS_RETRIEVAL_CANDIDATES", "20"))
+RRF_K = int(os.getenv("JARVIS_RRF_K", "60"))
+
+
+def _extract_docx_worker(file_path: str) -> Tuple[str, List[Block]]:
+    """Process-pool entry point: extract the blocks of one DOCX file."""
+    return file_path, RAGSystem.extract_blocks_from_docx(file_path)
 
 
 class RAGSystem:
-    def __init__(self, persist_directory: str = None):
-        """Initialize the RAG system with ChromaDB."""
+    def __init__(self, persist_directory: str = None, embedding_function=None, storage: Optional[Storage] = None):
+        """Initialize the RAG system with ChromaDB.
+        
+        Embeddings are computed by `embedding_function` (default: the shared,
+        warmed-up backend selected by JARVIS_EMBEDDING_BACKEND) and handed to
+        ChromaDB explicitly, for both documents and queries.
+        
+        `storage` supplies the client records documents are mapped to when an
+        ingest call passes none; without it such documents get no client.
+        """
         if persist_directory is None:
             # Default to backend/data/chroma_db
             persist_directory = str(Path(__file__).parent / "data" / "chroma_db")
             
         self.persist_directory = persist_directory
         Path(persist_directory).mkdir(parents=True, exist_ok=True)
+        self.storage = storage
+        
+        self.embedding_function = embedding_function or get_embedding_function()
+        # Chunks are sized in the embedding model's own tokens
+        self.count_tokens = get_token_counter(self.embedding_function)
+        self._query_cache: OrderedDict = OrderedDict()
+        self._query_cache_lock = threading.Lock()
         
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        self._connect()
+    
+    def _connect(self) -> None:
+        """Open the persistent client, the collection and the ingest manifest."""
+        self.client = chromadb.PersistentClient(path=self.persist_directory)
         
         # Create or get collection
         try:
@@ -32,59 +83,113 @@ class RAGSystem:
                 name="client_documents",
                 metadata={"description": "Client documents and context"}
             )
+        
+        # What has been ingested per source file, for idempotent re-ingestion
+        self.manifest = IngestManifest(Path(self.persist_directory) / MANIFEST_FILE)
+        
+        # BM25 index over the same chunks, rebuilt if it has drifted from the collection
+        self.keyword_index = BM25Index(Path(self.persist_directory) / "bm25_index.sqlite3")
+        if self.keyword_index.count() != self.collection.count():
+            self.rebuild_keyword_index()
+    
+    def rebuild_keyword_index(self) -> None:
+        """Re-index every chunk in the collection for BM25 search."""
+        self.keyword_index.clear()
+        total = self.collection.count()
+        batch_size = self.client.get_max_batch_size()
+        for offset in range(0, total, batch_size):
+            batch = self.collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            self.keyword_index.upsert(batch["ids"], batch["documents"], batch["metadatas"])
+        if total:
+            print(f"🔤 Built BM25 index for {total} chunks")
     
-    def extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text content from a DOCX file."""
+    def reload(self) -> None:
+        """Reconnect to the store to pick up chunks written by another process.
+        
+        ChromaDB keeps one in-memory vector index per path and process, so a
+        long-lived client does not see vectors another process has added.
+        """
+        self.client.clear_system_cache()
+        self.keyword_index.close()
+        self._connect()
+    
+    @staticmethod
+    def extract_text_from_docx(file_path: str) -> str:
+        """Extract text content from a DOCX file.
+        
+        Streams word/document.xml (see docx_stream) so memory stays bounded
+        and merged table cells are only emitted once.
+        """
         try:
-            doc = Document(file_path)
-            full_text = []
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    full_text.append(paragraph.text)
-            
-            # Also extract from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            full_text.append(cell.text)
-            
-            return "\n".join(full_text)
+            return extract_docx_text(file_path)
         except Exception as e:
             print(f"Error extracting text from {file_path}: {e}")
             return ""
     
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
-        """Split text into overlapping chunks."""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = " ".join(words[i:i + chunk_size])
-            if chunk:
-                chunks.append(chunk)
-        
-        return chunks
+    @staticmethod
+    def extract_blocks_from_docx(file_path: str) -> List[Block]:
+        """Extract paragraphs (with style) and table rows from a DOCX file, in document order."""
+        try:
+            return list(iter_docx_blocks(file_path))
+        except Exception as e:
+            print(f"Error extracting text from {file_path}: {e}")
+            return []
+    
+    def chunk_text(self, text: str, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+        """Split plain text into token-bounded chunks at line boundaries."""
+        return [chunk["text"] for chunk in chunk_blocks(text_to_blocks(text), self.count_tokens, max_tokens, overlap_tokens)]
+    
+    def chunk_document(self, blocks: List[Block]) -> List[Dict[str, Any]]:
+        """Split document blocks into token-bounded chunks with section metadata."""
+        return chunk_blocks(blocks, self.count_tokens)
     
     def ingest_document(self, file_path: str, metadata: Dict[str, Any] = None) -> int:
-        """Ingest a single document into the RAG system."""
+        """Ingest a single document into the RAG system.
+        
+        Unchanged files (per the ingest manifest) are skipped without parsing.
+        The chunks' client_id is resolved from the file name unless `metadata`
+        sets one.
+        """
         if not os.path.exists(file_path):
             print(f"File not found: {file_path}")
             return 0
         
-        # Extract text
-        text = self.extract_text_from_docx(file_path)
-        if not text:
+        changed, file_state = self._check_manifest(file_path)
+        if not changed:
+            self.manifest.save()
+            print(f"⏭️  Unchanged, skipped {os.path.basename(file_path)}")
+            return len(file_state["chunk_ids"])
+        
+        # Extract paragraphs and table rows
+        blocks = self.extract_blocks_from_docx(file_path)
+        if not blocks:
             print(f"No text extracted from {file_path}")
             return 0
         
+        metadata = {"client_id": self._client_index().resolve(os.path.basename(file_path)), **(metadata or {})}
+        staged = self._new_staging()
+        chunk_count = self._stage_document(file_path, blocks, file_state, staged, metadata)
+        self._write_staged(staged)
+        self.manifest.save()
+        
+        print(f"✅ Ingested {chunk_count} chunks from {os.path.basename(file_path)}")
+        return chunk_count
+    
+    def _prepare_chunks(
+        self, file_path: str, blocks: List[Block], metadata: Dict[str, Any] = None
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Chunk extracted blocks and build the ids/documents/metadatas for ChromaDB.
+        
+        Chunk ids are content-addressed, so an unchanged chunk keeps its id (and
+        its embedding) when the rest of the document changes.
+        """
         # Create chunks
-        chunks = self.chunk_text(text)
+        chunks = self.chunk_document(blocks)
+        source = os.path.basename(file_path)
         
         # Prepare metadata
         base_metadata = {
-            "source": os.path.basename(file_path),
+            "source": source,
             "file_path": file_path,
             "ingested_at": datetime.now().isoformat(),
             "chunk_count": len(chunks)
@@ -93,79 +198,523 @@ class RAGSystem:
         if metadata:
             base_metadata.update(metadata)
         
-        # Add to ChromaDB
         ids = []
         metadatas = []
         documents = []
+        seen: Dict[str, int] = {}
         
         for i, chunk in enumerate(chunks):
-            chunk_id = f"{os.path.basename(file_path)}_chunk_{i}"
+            text = chunk["text"]
+            chunk_id = f"{source}_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+            # Identical chunks within one document get an occurrence suffix
+            seen[chunk_id] = seen.get(chunk_id, 0) + 1
+            if seen[chunk_id] > 1:
+                chunk_id = f"{chunk_id}_{seen[chunk_id]}"
             chunk_metadata = base_metadata.copy()
             chunk_metadata["chunk_index"] = i
+            chunk_metadata["section"] = chunk["section"]
+            chunk_metadata["block_kind"] = chunk["kind"]
+            chunk_metadata["token_count"] = chunk["token_count"]
             
             ids.append(chunk_id)
             metadatas.append(chunk_metadata)
-            documents.append(chunk)
+            documents.append(text)
+        
+        return ids, documents, metadatas
+    
+    def _check_manifest(self, file_path: str) -> Tuple[bool, Dict[str, Any]]:
+        """Decide whether a file needs (re-)ingesting.
+        
+        Returns (changed, state). A matching mtime and size skips the file
+        without reading it; otherwise the content hash decides. Files chunked
+        by an older chunker version are always re-chunked.
+        """
+        source = os.path.basename(file_path)
+        stat = os.stat(file_path)
+        entry = self.manifest.get(source)
+        if entry and entry.get("chunker") != CHUNKER_VERSION:
+            entry = None
+        
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return False, entry
+        
+        state = {"file_path": file_path, "mtime": stat.st_mtime, "size": stat.st_size, "sha256": file_sha256(file_path)}
+        if entry and entry.get("sha256") == state["sha256"]:
+            # Touched but identical: refresh the stat fields only
+            entry = {**entry, **state}
+            self.manifest.set(source, entry)
+            return False, entry
+        
+        return True, state
+    
+    def _new_staging(self) -> Dict[str, Any]:
+        return {"upsert_ids": [], "upsert_documents": [], "upsert_metadatas": [],
+                "pending": [], "upserts_staged": 0, "upserts_written": 0}
+    
+    def _stage_document(
+        self,
+        file_path: str,
+        blocks: List[Block],
+        file_state: Dict[str, Any],
+        staged: Dict[str, list],
+        metadata: Dict[str, Any] = None
+    ) -> int:
+        """Diff a changed document against its manifest entry and stage the ChromaDB writes.
+        
+        New chunks are upserted (embedded), surviving chunks only get their
+        metadata refreshed, and chunks that no longer exist are deleted. The
+        document's manifest entry is held back until all of this is written
+        (see _commit_documents).
+        """
+        source = os.path.basename(file_path)
+        ids, documents, metadatas = self._prepare_chunks(file_path, blocks, metadata)
         
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+        entry = self.manifest.get(source)
+        if entry is None:
+            # Clear chunks written before this source was tracked
+            self.collection.delete(where={"source": source})
+            self.keyword_index.delete_source(source)
+        previous = set(entry["chunk_ids"]) if entry else set()
+        
+        update_ids, update_metadatas = [], []
+        for chunk_id, document, chunk_metadata in zip(ids, documents, metadatas):
+            if chunk_id in previous:
+                update_ids.append(chunk_id)
+                update_metadatas.append(chunk_metadata)
+            else:
+                staged["upsert_ids"].append(chunk_id)
+                staged["upsert_documents"].append(document)
+                staged["upsert_metadatas"].append(chunk_metadata)
+                staged["upserts_staged"] += 1
+        
+        staged["pending"].append({
+            "source": source,
+            # Committed once the upserts staged so far have all been written
+            "upserts_through": staged["upserts_staged"],
+            "update_ids": update_ids,
+            "update_metadatas": update_metadatas,
+            "delete_ids": list(previous - set(ids)),
+            "entry": {**file_state, "chunk_ids": ids, "chunker": CHUNKER_VERSION,
+                      "client_id": (metadata or {}).get("client_id", ""),
+                      "ingested_at": datetime.now().isoformat()}
+        })
+        return len(ids)
+    
+    def _write_staged(self, staged: Dict[str, Any], batch_size: int = None, final: bool = True) -> int:
+        """Send staged writes to ChromaDB in batches; returns chunks embedded and written.
+        
+        Only full batches are written unless `final` is set, so callers can
+        keep accumulating chunks across documents. Documents whose chunks have
+        all been written are committed to the manifest as they complete.
+        """
+        batch_size = batch_size or self.client.get_max_batch_size()
+        written = 0
+        
+        while len(staged["upsert_ids"]) >= batch_size or (final and staged["upsert_ids"]):
+            documents = staged["upsert_documents"][:batch_size]
+            self.collection.upsert(
+                ids=staged["upsert_ids"][:batch_size],
+                documents=documents,
+                metadatas=staged["upsert_metadatas"][:batch_size],
+                embeddings=self.embedding_function(documents)
+            )
+            self.keyword_index.upsert(
+                staged["upsert_ids"][:batch_size], documents, staged["upsert_metadatas"][:batch_size]
+            )
+            written += len(documents)
+            staged["upserts_written"] += len(documents)
+            del staged["upsert_ids"][:batch_size], staged["upsert_documents"][:batch_size], staged["upsert_metadatas"][:batch_size]
+            self._commit_documents(staged, batch_size)
+        
+        self._commit_documents(staged, batch_size)
+        return written
+    
+    def _commit_documents(self, staged: Dict[str, Any], batch_size: int) -> None:
+        """Finish the staged documents whose new chunks are all written.
+        
+        Their surviving chunks get the new metadata, their stale chunks are
+        deleted and only then is their manifest entry recorded, so a run that
+        fails partway leaves unfinished files to be ingested again.
+        """
+        while staged["pending"] and staged["pending"][0]["upserts_through"] <= staged["upserts_written"]:
+            document = staged["pending"].pop(0)
+            # Metadata updates and deletes never touch the embedding model
+            for start in range(0, len(document["update_ids"]), batch_size):
+                self.collection.update(
+                    ids=document["update_ids"][start:start + batch_size],
+                    metadatas=document["update_metadatas"][start:start + batch_size]
+                )
+            for start in range(0, len(document["delete_ids"]), batch_size):
+                self.collection.delete(ids=document["delete_ids"][start:start + batch_size])
+                self.keyword_index.delete(document["delete_ids"][start:start + batch_size])
+            self.manifest.set(document["source"], document["entry"])
+    
+    def delete_document(self, source: str) -> int:
+        """Remove a source's chunks and manifest entry; returns chunks deleted."""
+        entry = self.manifest.remove(source)
+        if entry and entry["chunk_ids"]:
+            self.collection.delete(ids=entry["chunk_ids"])
+            self.keyword_index.delete(entry["chunk_ids"])
+        else:
+            self.collection.delete(where={"source": source})
+            self.keyword_index.delete_source(source)
+        self.manifest.save()
+        return len(entry["chunk_ids"]) if entry else 0
+    
+    def _client_index(self, clients: Optional[List[Dict[str, Any]]] = None) -> ClientIndex:
+        if clients is None:
+            clients = self.storage.list_clients() if self.storage else []
+        return ClientIndex(clients)
+    
+    def client_chunk_ids(self, client_id: str) -> List[str]:
+        """Ids of every ingested chunk of the documents mapped to client_id."""
+        return self.manifest.client_chunk_ids(client_id)
+    
+    def assign_clients(self, clients: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Re-resolve which client each ingested document belongs to.
         
-        print(f"✅ Ingested {len(chunks)} chunks from {os.path.basename(file_path)}")
-        return len(chunks)
+        Chunks of documents whose mapping changed (for example a client record
+        added after its file was ingested) get their client_id metadata
+        updated in place; nothing is re-embedded. Returns documents re-tagged.
+        """
+        return self._assign_clients(self._client_index(clients))
+    
+    def _assign_clients(self, client_index: ClientIndex) -> int:
+        changed = 0
+        for source, entry in list(self.manifest.entries.items()):
+            client_id = client_index.resolve(source)
+            if entry.get("client_id") == client_id:
+                continue
+            if entry["chunk_ids"]:
+                current = self.collection.get(ids=entry["chunk_ids"], include=["metadatas"])
+                self.collection.update(
+                    ids=current["ids"],
+                    metadatas=[{**(m or {}), "client_id": client_id} for m in current["metadatas"]]
+                )
+            self.manifest.set(source, {**entry, "client_id": client_id})
+            changed += 1
+        if changed:
+            self.manifest.save()
+            print(f"👤 Mapped {changed} documents to clients")
+        return changed
     
-    def ingest_directory(self, directory_path: str) -> Dict[str, int]:
-        """Ingest all DOCX files from a directory."""
+    def ingest_directory(
+        self,
+        directory_path: str,
+        batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        workers: int = DEFAULT_INGEST_WORKERS,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        clients: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        """Ingest all DOCX files from a directory.
+        
+        Runs as a pipeline: DOCX extraction fans out over a process pool while
+        the main process chunks finished files and sends cross-document
+        batches of `batch_size` chunks to ChromaDB for embedding. Files that
+        are unchanged since the last run are skipped, and sources whose files
+        were removed from the directory are deleted.
+        
+        Every chunk is tagged with the client_id its file name maps to among
+        `clients` (default: the records in this system's storage); unchanged
+        files are re-tagged if that mapping has changed.
+        
+        `progress`, if given, is called after each file with counters: files_total,
+        files_skipped, files_done, chunks_staged, chunks_written and throughput.
+        """
         directory = Path(directory_path)
         results = {}
+        client_index = self._client_index(clients)
         
         if not directory.exists():
             print(f"Directory not found: {directory_path}")
             return results
         
-        docx_files = list(directory.glob("*.docx"))
+        # Skip temporary files
+        docx_files = [str(p) for p in sorted(directory.glob("*.docx")) if not p.name.startswith("~$")]
+        
+        # Drop sources whose files have disappeared from this directory, however it was spelled
+        present = {os.path.basename(p) for p in docx_files}
+        resolved = directory.resolve()
+        for source, entry in list(self.manifest.entries.items()):
+            if source not in present and Path(entry["file_path"]).resolve().parent == resolved:
+                removed = self.delete_document(source)
+                print(f"🗑️  Removed {removed} chunks from deleted file {source}")
         
         if not docx_files:
             print(f"No DOCX files found in {directory_path}")
             return results
         
-        print(f"\n📚 Ingesting {len(docx_files)} documents...")
+        start = time.perf_counter()
         
+        # Only changed files are parsed
+        to_ingest: List[str] = []
+        file_states: Dict[str, Dict[str, Any]] = {}
         for file_path in docx_files:
-            # Skip temporary files
-            if file_path.name.startswith("~$"):
-                continue
+            changed, file_state = self._check_manifest(file_path)
+            if changed:
+                to_ingest.append(file_path)
+                file_states[file_path] = file_state
+            else:
+                results[os.path.basename(file_path)] = len(file_state["chunk_ids"])
+        skipped = len(results)
+        
+        batch_size = max(1, min(batch_size, self.client.get_max_batch_size()))
+        workers = max(1, min(workers, len(to_ingest)))
+        print(f"\n📚 Ingesting {len(to_ingest)} changed documents, {skipped} unchanged "
+              f"({workers} extraction workers, batches of {batch_size} chunks)...")
+        
+        staged = self._new_staging()
+        total_chunks = 0
+        counters = {"files_total": len(docx_files), "files_skipped": skipped, "files_done": 0,
+                    "chunks_staged": 0, "chunks_written": 0, "current_file": None}
+        
+        def report() -> None:
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress({**counters, "elapsed_seconds": round(elapsed, 2),
+                          "docs_per_second": round(counters["files_done"] / elapsed, 2) if elapsed else 0.0,
+                          "chunks_per_second": round(counters["chunks_written"] / elapsed, 2) if elapsed else 0.0})
+        
+        report()
+        
+        executor = None
+        if workers > 1:
+            # Spawned, not forked: the caller (e.g. the job worker) already runs ONNX Runtime and ChromaDB threads
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            if executor:
+                extracted = executor.map(_extract_docx_worker, to_ingest, chunksize=max(1, len(to_ingest) // (workers * 8)))
+            else:
+                extracted = map(_extract_docx_worker, to_ingest)
             
-            chunk_count = self.ingest_document(str(file_path))
-            results[file_path.name] = chunk_count
+            for file_path, blocks in extracted:
+                name = os.path.basename(file_path)
+                counters["files_done"] += 1
+                counters["current_file"] = name
+                if not blocks:
+                    print(f"No text extracted from {file_path}")
+                    results[name] = 0
+                    report()
+                    continue
+                
+                chunk_count = self._stage_document(file_path, blocks, file_states[file_path], staged,
+                                                   {"client_id": client_index.resolve(name)})
+                results[name] = chunk_count
+                total_chunks += chunk_count
+                counters["chunks_staged"] = total_chunks
+                
+                # Embed full cross-document batches as soon as they are available
+                counters["chunks_written"] += self._write_staged(staged, batch_size, final=False)
+                report()
+            
+            counters["chunks_written"] += self._write_staged(staged, batch_size)
+            counters["current_file"] = None
+            report()
+        finally:
+            if executor:
+                executor.shutdown()
+            # Holds only the documents that were fully written
+            self.manifest.save()
+        
+        # Unchanged files keep their chunks but may now belong to a different client
+        self._assign_clients(client_index)
         
-        print(f"\n✅ Ingestion complete! Total documents: {len(results)}")
+        elapsed = time.perf_counter() - start
+        ingested = len(results) - skipped
+        print(f"\n✅ Ingestion complete! Total documents: {len(results)} ({ingested} ingested, {skipped} unchanged), "
+              f"chunks: {total_chunks} ({ingested / elapsed:.1f} docs/s, {total_chunks / elapsed:.1f} chunks/s)")
         return results
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Search for relevant documents."""
+    def embed_queries(self, queries: List[str]) -> List[Any]:
+        """Embed queries in one batch, serving repeats from an LRU cache."""
+        with self._query_cache_lock:
+            vectors = {q: self._query_cache[q] for q in dict.fromkeys(queries) if q in self._query_cache}
+        
+        missing = [q for q in dict.fromkeys(queries) if q not in vectors]
+        if missing:
+            # Outside the lock; the result is built from this local map, so a batch
+            # larger than the cache never has to re-embed what it evicted
+            vectors.update(zip(missing, self.embedding_function(missing)))
+        
+        with self._query_cache_lock:
+            for query in vectors:
+                self._query_cache[query] = vectors[query]
+                self._query_cache.move_to_end(query)
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return [vectors[query] for query in queries]
+    
+    def search_many(
+        self, queries: List[str], n_results: int = 5, mode: str = None,
+        client_ids: Optional[List[Optional[str]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for many queries at once.
+        
+        In "hybrid" mode (the default, see JARVIS_RETRIEVAL) the top
+        RETRIEVAL_CANDIDATES chunks by vector similarity and by BM25 are fused
+        with reciprocal rank fusion; "vector" and "keyword" use one ranking.
+        
+        `client_ids`, parallel to `queries`, limits each query to the chunks of
+        that client; None searches everything and "" (a client with no
+        documents) finds nothing.
+        
+        All queries are embedded in one batch and sent to ChromaDB in as few
+        query calls as possible. Returns one result list per query, in order.
+        """
+        if not queries:
+            return []
+        mode = mode or RETRIEVAL_MODE
+        client_ids = client_ids or [None] * len(queries)
+        
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, client_id in enumerate(client_ids):
+            if client_id != "":
+                groups.setdefault(client_id, []).append(i)
+        
+        formatted_results: List[List[Dict[str, Any]]] = [[] for _ in queries]
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
-            
-            formatted_results = []
-            
-            if results and results['documents'] and len(results['documents']) > 0:
-                for i in range(len(results['documents'][0])):
-                    formatted_results.append({
-                        "content": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
-                        "distance": results['distances'][0][i] if results['distances'] else None
-                    })
+            positions = [i for members in groups.values() for i in members]
+            embeddings = {}
+            if mode != "keyword" and positions:
+                embeddings = dict(zip(positions, self.embed_queries([queries[i] for i in positions])))
             
+            for client_id, members in groups.items():
+                texts = [queries[i] for i in members]
+                vectors = [embeddings[i] for i in members] if embeddings else None
+                if client_id is None:
+                    hits = self._search_collection(texts, vectors, n_results, mode)
+                else:
+                    hits = self._search_client(client_id, texts, vectors, n_results, mode)
+                for i, result in zip(members, hits):
+                    formatted_results[i] = result
             return formatted_results
         except Exception as e:
             print(f"Search error: {e}")
+            return [[] for _ in queries]
+    
+    def _search_collection(
+        self, queries: List[str], embeddings: Optional[List[List[float]]], n_results: int, mode: str
+    ) -> List[List[Dict[str, Any]]]:
+        """Search the whole collection: ChromaDB for vectors, the FTS5 index for BM25."""
+        if mode == "keyword":
+            return [self._fetch_hits([chunk_id for chunk_id, _ in ranked[:n_results]])
+                    for ranked in self.keyword_index.search_many(queries, n_results)]
+        
+        candidates = max(n_results, RETRIEVAL_CANDIDATES) if mode == "hybrid" else n_results
+        formatted_results = []
+        for start in range(0, len(queries), DEFAULT_EMBED_BATCH_SIZE):
+            batch = embeddings[start:start + DEFAULT_EMBED_BATCH_SIZE]
+            results = self.collection.query(query_embeddings=batch, n_results=candidates)
+            formatted_results.extend(self._format_query_results(results, len(batch)))
+        
+        if mode != "hybrid":
+            return formatted_results
+        return [self._fuse(dense, lexical, n_results) for dense, lexical
+                in zip(formatted_results, self.keyword_index.search_many(queries, candidates))]
+    
+    def _search_client(
+        self, client_id: str, queries: List[str], embeddings: Optional[List[List[float]]],
+        n_results: int, mode: str
+    ) -> List[List[Dict[str, Any]]]:
+        """Search one client's chunks only.
+        
+        The chunks are looked up by id through the manifest's per-client
+        partition and ranked in memory, by squared L2 distance (the
+        collection's metric) and by BM25 over the client's own chunks, so the
+        cost depends on the client's documents rather than on the size of the
+        collection.
+        """
+        chunk_ids = self.manifest.client_chunk_ids(client_id)
+        if not chunk_ids:
+            return [[] for _ in queries]
+        include = ["documents", "metadatas"] if mode == "keyword" else ["embeddings", "documents", "metadatas"]
+        chunks = self.collection.get(ids=chunk_ids, include=include)
+        ids = chunks["ids"]
+        position = {chunk_id: j for j, chunk_id in enumerate(ids)}
+        
+        distances = None
+        if mode != "keyword":
+            matrix = np.asarray(chunks["embeddings"], dtype=np.float32)
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            distances = ((vectors[:, None, :] - matrix[None, :, :]) ** 2).sum(axis=2)
+        
+        candidates = max(n_results, RETRIEVAL_CANDIDATES) if mode == "hybrid" else n_results
+        formatted_results = []
+        for q, query in enumerate(queries):
+            dense = list(np.argsort(distances[q], kind="stable")[:candidates]) if distances is not None else []
+            lexical = []
+            if mode != "vector":
+                scores = score_documents(query, chunks["documents"])
+                lexical = sorted((j for j, score in enumerate(scores) if score > 0),
+                                 key=lambda j: scores[j], reverse=True)[:candidates]
+            
+            if mode == "hybrid":
+                fused = reciprocal_rank_fusion([[ids[j] for j in dense], [ids[j] for j in lexical]], k=RRF_K)
+                ranked = [(position[chunk_id], score) for chunk_id, score in fused[:n_results]]
+            else:
+                ranked = [(j, None) for j in (dense if mode == "vector" else lexical)[:n_results]]
+            
+            hits = []
+            for j, score in ranked:
+                hit = {
+                    "id": ids[j],
+                    "content": chunks["documents"][j],
+                    "metadata": chunks["metadatas"][j] or {},
+                    "distance": float(distances[q][j]) if distances is not None else None
+                }
+                if score is not None:
+                    hit["score"] = score
+                hits.append(hit)
+            formatted_results.append(hits)
+        return formatted_results
+    
+    def _fuse(
+        self, dense: List[Dict[str, Any]], lexical: List[Tuple[str, float]], n_results: int
+    ) -> List[Dict[str, Any]]:
+        """Reciprocal-rank fusion of vector hits and BM25 (chunk_id, score) pairs."""
+        fused = reciprocal_rank_fusion([[hit["id"] for hit in dense], [chunk_id for chunk_id, _ in lexical]], RRF_K)
+        top = fused[:n_results]
+        
+        hits_by_id = {hit["id"]: hit for hit in dense}
+        missing = [chunk_id for chunk_id, _ in top if chunk_id not in hits_by_id]
+        hits_by_id.update((hit["id"], hit) for hit in self._fetch_hits(missing))
+        
+        return [{**hits_by_id[chunk_id], "score": score} for chunk_id, score in top if chunk_id in hits_by_id]
+    
+    def _fetch_hits(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Chunks by id, in the given order, shaped like search hits."""
+        if not ids:
             return []
+        results = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        found = {
+            chunk_id: {"id": chunk_id, "content": document, "metadata": metadata or {}, "distance": None}
+            for chunk_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        return [found[chunk_id] for chunk_id in ids if chunk_id in found]
+    
+    def _format_query_results(self, results: Dict[str, Any], query_count: int) -> List[List[Dict[str, Any]]]:
+        """Turn a ChromaDB query response into one list of hits per query."""
+        formatted_results = []
+        
+        for q in range(query_count):
+            hits = []
+            if results and results['documents'] and len(results['documents']) > q:
+                for i in range(len(results['documents'][q])):
+                    hits.append({
+                        "id": results['ids'][q][i],
+                        "content": results['documents'][q][i],
+                        "metadata": results['metadatas'][q][i] if results['metadatas'] else {},
+                        "distance": results['distances'][q][i] if results['distances'] else None
+                    })
+            formatted_results.append(hits)
+        
+        return formatted_results
+    
+    def search(
+        self, query: str, n_results: int = 5, mode: str = None, client_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for relevant documents, optionally only those of one client."""
+        return self.search_many([query], n_results, mode, [client_id])[0]
     
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """Get all documents in the collection."""
@@ -187,45 +736,42 @@ class RAGSystem:
             return []
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get statistics about the RAG system."""
+        """Get statistics about the RAG system from the ingest manifest (see IngestManifest.stats)."""
         try:
-            count = self.collection.count()
-            
-            # Get unique sources
-            all_docs = self.get_all_documents()
-            sources = set()
-            for doc in all_docs:
-                if 'source' in doc['metadata']:
-                    sources.add(doc['metadata']['source'])
-            
-            return {
-                "total_chunks": count,
-                "total_documents": len(sources),
-                "sources": list(sources)
-            }
+            return self.manifest.stats()
         except Exception as e:
             print(f"Error getting stats: {e}")
             return {"total_chunks": 0, "total_documents": 0, "sources": []}
+    
+    def list_documents(self, client_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-source chunk counts, sizes, ingest times and clients, from the manifest."""
+        return self.manifest.documents(client_id)
+    
+    def get_document(self, source: str) -> Optional[Dict[str, Any]]:
+        self.manifest.refresh()
+        return self.manifest.summary(source)
 
 
 # Standalone functions for easy import
 def create_rag_system() -> RAGSystem:
-    """Create and return a RAG system instance."""
-    return RAGSystem()
+    """Create and return a RAG system instance over the default data directory."""
+    return RAGSystem(storage=get_storage())
 
 
-def ingest_documents(directory_path: str = None) -> Dict[str, int]:
+def ingest_documents(
+    directory_path: str = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, int]:
     """Ingest all documents from the specified directory."""
     if directory_path is None:
         directory_path = str(Path(__file__).parent / "data" / "client_documents")
     rag = create_rag_system()
-    return rag.ingest_directory(directory_path)
+    return rag.ingest_directory(directory_path, progress=progress)
 
 
 if __name__ == "__main__":
     # Test the RAG system
     print("🚀 Initializing RAG System...")
-    rag = RAGSystem()
+    rag = create_rag_system()
     
     # Ingest documents
     results = rag.ingest_directory("./data/client_documents")
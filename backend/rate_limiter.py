@@ -0,0 +1,262 @@
+"""
+Adaptive Rate Limiting for LLM Calls
+Shared token-bucket throttling (requests/min and tokens/min) with a retry scheduler
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from metrics import record
+
+
+# Defaults match the Gemma free-tier quota; override per deployment.
+DEFAULT_REQUESTS_PER_MINUTE = float(os.getenv("JARVIS_LLM_RPM", "30"))
+DEFAULT_TOKENS_PER_MINUTE = float(os.getenv("JARVIS_LLM_TPM", "15000"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("JARVIS_LLM_MAX_ATTEMPTS", "5"))
+
+# Rough completion size reserved up front; corrected once usage is known.
+EXPECTED_COMPLETION_TOKENS = 512
+
+RETRYABLE_MARKERS = (
+    "429",
+    "resource_exhausted",
+    "resource exhausted",
+    "rate limit",
+    "quota",
+    "503",
+    "unavailable",
+    "internal error",
+    "deadline",
+    "timeout",
+    "timed out",
+    "connection",
+)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Return True for throttling and transient provider errors."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Return True when the provider rejected the call for quota reasons."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        return status == 429
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("429", "resource_exhausted", "resource exhausted", "rate limit", "quota"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    Reservations are granted immediately and may push the bucket into debt;
+    the caller sleeps for the returned delay, which keeps waiters FIFO-fair.
+    The default capacity allows roughly one second of burst.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 60.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_minute / 60.0)
+        self.updated_at = now
+
+    def set_rate(self, rate_per_minute: float) -> None:
+        """Change the refill rate without losing accumulated tokens."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate_per_minute = rate_per_minute
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens and return how many seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * 60.0 / self.rate_per_minute
+
+    def refund(self, amount: float) -> None:
+        """Return (or, if negative, additionally charge) tokens."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Shared requests/min + tokens/min limiter with AIMD adaptation.
+
+    A throttle (429) halves the effective rates (at most once per cooldown,
+    so a burst of rejections counts as one signal); each success recovers a
+    small step back toward the configured ceiling.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        min_fraction: float = 0.1,
+        recovery_step: float = 0.05,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.max_rpm = requests_per_minute
+        self.max_tpm = tokens_per_minute
+        self.min_fraction = min_fraction
+        self.recovery_step = recovery_step
+        self.decrease_cooldown = decrease_cooldown
+        self.last_decrease = float("-inf")
+        self.fraction = 1.0
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self.total_wait_seconds = 0.0
+
+    def _apply_fraction(self) -> None:
+        self.requests.set_rate(self.max_rpm * self.fraction)
+        self.tokens.set_rate(self.max_tpm * self.fraction)
+
+    def acquire(self, tokens: int) -> float:
+        """Block until one request carrying `tokens` tokens may be sent."""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+        with self._lock:
+            self.total_wait_seconds += wait
+        return wait
+
+    def settle(self, reserved_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the real usage of a call is known."""
+        self.tokens.refund(reserved_tokens - actual_tokens)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.fraction < 1.0:
+                self.fraction = min(1.0, self.fraction + self.recovery_step)
+                self._apply_fraction()
+
+    def record_throttle(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self.last_decrease < self.decrease_cooldown:
+                return
+            self.last_decrease = now
+            self.fraction = max(self.min_fraction, self.fraction / 2)
+            self._apply_fraction()
+
+
+class RetryBudget:
+    """Caps retries to a fraction of total requests so outages fail fast."""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Reserve one retry; False once the budget is exhausted."""
+        with self._lock:
+            if self.retries >= self.min_retries + self.ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class RateLimitedLLM(Runnable):
+    """Chat model wrapper that routes every call through a shared limiter and retry scheduler.
+
+    Being a Runnable, it composes with prompts exactly like the wrapped model
+    (`prompt | llm`).
+    """
+
+    def __init__(
+        self,
+        llm: Runnable,
+        limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+    ):
+        self.llm = llm
+        self.limiter = limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = retry_budget or RetryBudget()
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        text = input.to_string() if hasattr(input, "to_string") else str(input)
+        reserved = estimate_tokens(text) + EXPECTED_COMPLETION_TOKENS
+        self.retry_budget.record_request()
+        self._count("calls")
+        start = time.perf_counter()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            record(rate_limit_wait_seconds=self.limiter.acquire(reserved), llm_calls=1)
+            try:
+                response = self.llm.invoke(input, config, **kwargs)
+            except Exception as e:
+                self.limiter.settle(reserved, 0)
+                if is_throttle_error(e):
+                    self._count("throttled")
+                    self.limiter.record_throttle()
+                if (
+                    not is_retryable_error(e)
+                    or attempt >= self.retry_policy.max_attempts
+                    or not self.retry_budget.try_spend()
+                ):
+                    self._count("failures")
+                    record(llm_seconds=time.perf_counter() - start)
+                    raise
+                self._count("retries")
+                record(retries=1)
+                time.sleep(self.retry_policy.backoff(attempt))
+                continue
+
+            usage = getattr(response, "usage_metadata", None) or {}
+            self.limiter.settle(reserved, usage.get("total_tokens", reserved))
+            self.limiter.record_success()
+            record(llm_seconds=time.perf_counter() - start,
+                   prompt_tokens=usage.get("input_tokens", 0), completion_tokens=usage.get("output_tokens", 0))
+            return response
@@ -0,0 +1,90 @@
+"""
+Dashboard Data Repository
+Shared in-memory view of the JSON data files. Each file is parsed once and
+re-parsed only when its mtime or size changes; records are indexed by the
+keys the API joins on.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JsonDataset:
+    """A JSON list file with dict indexes on selected fields.
+
+    `indexes` maps an index name to the record field it is keyed on. When a
+    key occurs more than once the first record wins, matching a linear
+    `next(...)` scan over the list.
+    """
+
+    def __init__(self, path: Path, indexes: Dict[str, str]):
+        self.path = Path(path)
+        self.index_fields = indexes
+        self.items: List[Dict[str, Any]] = []
+        self.indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {name: {} for name in indexes}
+        self.stamp: Optional[Tuple[int, int]] = None
+
+    def refresh(self) -> bool:
+        """Reload the file if it changed on disk; returns True when reloaded."""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+
+        if stamp == self.stamp:
+            return False
+
+        items: List[Dict[str, Any]] = []
+        if stamp is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    items = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                items = []
+
+        indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for name, field in self.index_fields.items():
+            index: Dict[Any, Dict[str, Any]] = {}
+            for item in items:
+                key = item.get(field)
+                if key is not None and key not in index:
+                    index[key] = item
+            indexes[name] = index
+
+        # Swap in new objects so readers holding the old ones are unaffected
+        self.items, self.indexes, self.stamp = items, indexes, stamp
+        return True
+
+    def get(self, index: str, key: Any) -> Optional[Dict[str, Any]]:
+        return self.indexes[index].get(key)
+
+
+class DataRepository:
+    """Emails, responses and clients for the dashboard API, kept fresh by file mtime."""
+
+    def __init__(self, data_dir: Path):
+        data_dir = Path(data_dir)
+        self.emails = JsonDataset(data_dir / "emails_sent.json", {"id": "id", "client_email": "client_email"})
+        self.responses = JsonDataset(data_dir / "responses.json", {"id": "id"})
+        self.clients = JsonDataset(data_dir / "client_context.json", {"email": "email", "client_id": "client_id"})
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def refresh(self) -> int:
+        """Stat the data files, reloading any that changed; returns the data version."""
+        with self._lock:
+            changed = [dataset.refresh() for dataset in (self.emails, self.responses, self.clients)]
+            if any(changed):
+                self._version += 1
+            return self._version
+
+    def email_for_response(self, response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Email a response replies to, by id and falling back to the client's email address."""
+        return (self.emails.get("id", response.get("email_id"))
+                or self.emails.get("client_email", response.get("client_email")))
+
+    def client_for_response(self, response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.clients.get("email", response.get("client_email"))
@@ -0,0 +1,71 @@
+"""
+Per-Client Result Store
+Persists the last analysis result for each client together with the
+fingerprint of the inputs it was generated from, so unchanged clients can
+be skipped on the next overnight run.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def client_fingerprint(client: Dict[str, Any], chunk_ids: List[str]) -> str:
+    """Hash a client record together with the ids of all its ingested document chunks.
+
+    Chunk ids are content-addressed (source name plus a hash of the chunk
+    text), so an edit anywhere in the client's documents changes the result.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(client, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    for chunk_id in sorted(chunk_ids):
+        digest.update(b"\x00")
+        digest.update(chunk_id.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ClientResultStore:
+    """JSON-file store of {client_id: {fingerprint, result, updated_at}}."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def get(self, client_id: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result if it was produced from the same fingerprint."""
+        with self._lock:
+            entry = self.entries.get(client_id)
+        if entry and entry.get("fingerprint") == fingerprint:
+            return entry["result"]
+        return None
+
+    def put(self, client_id: str, fingerprint: str, result: Dict[str, Any], updated_at: str) -> None:
+        with self._lock:
+            self.entries[client_id] = {
+                "fingerprint": fingerprint,
+                "result": result,
+                "updated_at": updated_at
+            }
+
+    def prune(self, active_client_ids: Iterable[str]) -> None:
+        """Forget clients that are no longer in the client base."""
+        active = set(active_client_ids)
+        with self._lock:
+            for client_id in list(self.entries):
+                if client_id not in active:
+                    del self.entries[client_id]
+
+    def save(self) -> None:
+        """Atomically write the store to disk."""
+        with self._lock:
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            tmp_path.replace(self.path)
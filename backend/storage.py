@@ -0,0 +1,709 @@
+"""
+Storage Backends for Clients, Emails and Responses
+One interface for the API and the overnight run, with two implementations:
+
+    sqlite  data/jarvis.sqlite3 in WAL mode with indexed tables. Each overnight
+            run is appended with a run id, so email history is kept, and
+            dashboard metrics come from aggregate queries (default).
+    json    the original emails_sent.json / responses.json /
+            client_context.json files, rewritten on every run.
+
+On first use the SQLite database is populated from the JSON files. The import
+can be re-run by hand with `python storage.py import`.
+"""
+import argparse
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from repository import DataRepository
+
+
+STORAGE_BACKEND = os.getenv("JARVIS_STORAGE", "sqlite")
+DEFAULT_DATA_DIR = Path(__file__).parent / "data"
+SQLITE_FILENAME = "jarvis.sqlite3"
+
+# (response, email it answers, client who sent it)
+ResponseContext = Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# (records, cursor for the next page or None on the last page)
+Page = Tuple[List[Any], Optional[str]]
+
+
+def encode_cursor(position: List[Any]) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[Any, ...]) -> List[Any]:
+    """Inverse of encode_cursor for a position of the given element types.
+
+    Raises ValueError for a malformed cursor or one shaped for another listing.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, list) or len(position) != len(types) or not all(
+        isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(position, types)
+    ):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+class Storage:
+    """Interface shared by the storage backends.
+
+    "Current" emails are those produced by the latest overnight run, in the
+    order the run saved them (highest priority first).
+    """
+
+    location = ""
+
+    def __init__(self):
+        self._memo: Dict[str, Tuple[Any, Any]] = {}
+        self._memo_lock = threading.Lock()
+        self._listeners: List[Callable[[str, List[Dict[str, Any]]], None]] = []
+
+    def refresh(self) -> Any:
+        """Pick up external changes; returns a token that changes whenever the data does."""
+        raise NotImplementedError
+
+    def memo(self, name: str, builder: Callable[[], Any]) -> Any:
+        """Return builder() computed once per data version.
+
+        The result is shared between callers and must be treated as read-only.
+        """
+        version = self.refresh()
+        cached = self._memo.get(name)
+        if cached and cached[0] == version:
+            return cached[1]
+        value = builder()
+        with self._memo_lock:
+            self._memo[name] = (version, value)
+        return value
+
+    def subscribe(self, listener: Callable[[str, List[Dict[str, Any]]], None]) -> None:
+        """Call listener(kind, records) after each write made through this instance.
+
+        kind is "run" (the new current emails), "responses" or "clients".
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, kind: str, records: List[Dict[str, Any]]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(kind, records)
+            except Exception as e:
+                print(f"⚠️ Storage listener failed on {kind} write: {e}")
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def current_emails(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_responses(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def responses_with_context(
+        self, email_fallback: bool = True, ids: Optional[List[str]] = None
+    ) -> List[ResponseContext]:
+        """Responses joined to their email (by id, optionally falling back to the
+        current email for the same client address) and to their client.
+
+        Covers every response, or only those whose id is in `ids`.
+        """
+        raise NotImplementedError
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counts behind the dashboard and stats endpoints."""
+        raise NotImplementedError
+
+    # Paginated reads. Date bounds compare ISO timestamps: `since` is
+    # inclusive, `until` exclusive, so "2026-02-01" to "2026-03-01" is February.
+
+    def page_emails(
+        self, cursor: Optional[str] = None, limit: int = 100, client: Optional[str] = None,
+        since: Optional[str] = None, until: Optional[str] = None, min_priority: Optional[int] = None,
+        history: bool = False
+    ) -> Page:
+        """Current emails in saved order, or every run newest first when `history` is set.
+
+        `client` matches the client email address or client id.
+        """
+        raise NotImplementedError
+
+    def page_responses(
+        self, cursor: Optional[str] = None, limit: int = 100, client: Optional[str] = None,
+        sentiment: Optional[str] = None, priority: Optional[str] = None,
+        since: Optional[str] = None, until: Optional[str] = None
+    ) -> Page:
+        """Responses in arrival order; `client` matches the client email address."""
+        raise NotImplementedError
+
+    def page_clients(
+        self, cursor: Optional[str] = None, limit: int = 100, industry: Optional[str] = None,
+        min_engagement: Optional[float] = None
+    ) -> Page:
+        """Clients in stored order."""
+        raise NotImplementedError
+
+    def page_activity(
+        self, cursor: Optional[str] = None, limit: int = 100, client: Optional[str] = None,
+        kind: Optional[str] = None, sentiment: Optional[str] = None, priority: Optional[str] = None,
+        since: Optional[str] = None, until: Optional[str] = None
+    ) -> Page:
+        """Current emails and all responses, newest first, as ("email" | "response", record).
+
+        Ties keep emails before responses and each in stored order. `sentiment`
+        and `priority` only match responses.
+        """
+        raise NotImplementedError
+
+    def record_run(self, run_id: str, emails: List[Dict[str, Any]], started_at: str, finished_at: str) -> None:
+        """Save the emails produced by an overnight run as the current emails."""
+        raise NotImplementedError
+
+    def save_clients(self, clients: List[Dict[str, Any]]) -> None:
+        """Insert or update client records, keyed on client_id."""
+        raise NotImplementedError
+
+    def add_responses(self, responses: List[Dict[str, Any]]) -> None:
+        """Insert or update client responses, keyed on id."""
+        raise NotImplementedError
+
+
+def _metrics_from_records(
+    emails: List[Dict[str, Any]], responses: List[Dict[str, Any]], clients: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Dashboard metrics computed in Python (JSON backend)."""
+    sentiment_counts: Dict[str, int] = {}
+    for response in responses:
+        sentiment = response.get("sentiment", "neutral")
+        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
+    engagement_scores = [c.get("engagement_score", 0) for c in clients]
+    return {
+        "total_emails": len(emails),
+        "total_responses": len(responses),
+        "total_clients": len(clients),
+        "high_priority_responses": sum(1 for r in responses if r.get("priority") == "high"),
+        "avg_engagement_score": sum(engagement_scores) / len(engagement_scores) if engagement_scores else 0,
+        "sentiment_counts": sentiment_counts,
+        "last_sent_date": emails[-1]["sent_date"] if emails else None
+    }
+
+
+class JSONStorage(Storage):
+    """The original JSON files, served through the indexed DataRepository."""
+
+    def __init__(self, data_dir: Path):
+        super().__init__()
+        self.data_dir = Path(data_dir)
+        self.location = str(self.data_dir / "emails_sent.json")
+        self.repository = DataRepository(self.data_dir)
+
+    def refresh(self) -> int:
+        return self.repository.refresh()
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        self.refresh()
+        return self.repository.clients.items
+
+    def current_emails(self) -> List[Dict[str, Any]]:
+        self.refresh()
+        return self.repository.emails.items
+
+    def list_responses(self) -> List[Dict[str, Any]]:
+        self.refresh()
+        return self.repository.responses.items
+
+    def responses_with_context(
+        self, email_fallback: bool = True, ids: Optional[List[str]] = None
+    ) -> List[ResponseContext]:
+        self.refresh()
+        repo = self.repository
+        responses = repo.responses.items
+        if ids is not None:
+            wanted = set(ids)
+            responses = [r for r in responses if r.get("id") in wanted]
+        return [
+            (response,
+             repo.email_for_response(response) if email_fallback else repo.emails.get("id", response.get("email_id")),
+             repo.client_for_response(response))
+            for response in responses
+        ]
+
+    def metrics(self) -> Dict[str, Any]:
+        self.refresh()
+        return _metrics_from_records(self.repository.emails.items, self.repository.responses.items,
+                                     self.repository.clients.items)
+
+    @staticmethod
+    def _page_list(items: List[Any], keep: Callable[[Any], bool], cursor: Optional[str], limit: int) -> Page:
+        """Offset-cursor page over an in-memory list."""
+        index = decode_cursor(cursor, (int,))[0] if cursor else 0
+        page = []
+        while index < len(items):
+            if keep(items[index]):
+                if len(page) == limit:
+                    return page, encode_cursor([index])
+                page.append(items[index])
+            index += 1
+        return page, None
+
+    def page_emails(self, cursor=None, limit=100, client=None, since=None, until=None, min_priority=None,
+                    history=False) -> Page:
+        # The JSON backend only holds the latest run, so `history` changes nothing
+        def keep(e):
+            return ((client is None or client in (e.get("client_email"), e.get("client_id")))
+                    and (since is None or (e.get("sent_date") or "") >= since)
+                    and (until is None or (e.get("sent_date") or "") < until)
+                    and (min_priority is None or (e.get("priority_score") or 0) >= min_priority))
+        return self._page_list(self.current_emails(), keep, cursor, limit)
+
+    def page_responses(self, cursor=None, limit=100, client=None, sentiment=None, priority=None,
+                       since=None, until=None) -> Page:
+        def keep(r):
+            return ((client is None or r.get("client_email") == client)
+                    and (sentiment is None or r.get("sentiment", "neutral") == sentiment)
+                    and (priority is None or r.get("priority") == priority)
+                    and (since is None or (r.get("response_date") or "") >= since)
+                    and (until is None or (r.get("response_date") or "") < until))
+        return self._page_list(self.list_responses(), keep, cursor, limit)
+
+    def page_clients(self, cursor=None, limit=100, industry=None, min_engagement=None) -> Page:
+        def keep(c):
+            return ((industry is None or c.get("industry") == industry)
+                    and (min_engagement is None or (c.get("engagement_score") or 0) >= min_engagement))
+        return self._page_list(self.list_clients(), keep, cursor, limit)
+
+    def _timeline(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """(timestamp, kind, record) for current emails and responses, newest first."""
+        timeline = [(e.get("sent_date") or "", "email", e) for e in self.current_emails()]
+        timeline += [(r.get("response_date") or "", "response", r) for r in self.list_responses()]
+        timeline.sort(key=lambda x: x[0], reverse=True)
+        return timeline
+
+    def page_activity(self, cursor=None, limit=100, client=None, kind=None, sentiment=None, priority=None,
+                      since=None, until=None) -> Page:
+        def keep(entry):
+            ts, entry_kind, record = entry
+            if kind is not None and entry_kind != kind:
+                return False
+            if (sentiment is not None or priority is not None) and entry_kind != "response":
+                return False
+            return ((client is None or record.get("client_email") == client)
+                    and (sentiment is None or record.get("sentiment", "neutral") == sentiment)
+                    and (priority is None or record.get("priority") == priority)
+                    and (since is None or ts >= since)
+                    and (until is None or ts < until))
+        records, next_cursor = self._page_list(self.memo("timeline", self._timeline), keep, cursor, limit)
+        return [(entry_kind, record) for _ts, entry_kind, record in records], next_cursor
+
+    def _write(self, filename: str, records: List[Dict[str, Any]]) -> None:
+        with open(self.data_dir / filename, 'w') as f:
+            json.dump(records, f, indent=2)
+
+    def record_run(self, run_id: str, emails: List[Dict[str, Any]], started_at: str, finished_at: str) -> None:
+        # The JSON backend only keeps the latest run
+        self._write("emails_sent.json", emails)
+        self._notify("run", emails)
+
+    def save_clients(self, clients: List[Dict[str, Any]]) -> None:
+        merged = {c["client_id"]: c for c in self.list_clients()}
+        merged.update({c["client_id"]: c for c in clients})
+        self._write("client_context.json", list(merged.values()))
+        self._notify("clients", clients)
+
+    def add_responses(self, responses: List[Dict[str, Any]]) -> None:
+        merged = {r["id"]: r for r in self.list_responses()}
+        merged.update({r["id"]: r for r in responses})
+        self._write("responses.json", list(merged.values()))
+        self._notify("responses", responses)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clients (
+    client_id TEXT PRIMARY KEY,
+    email TEXT,
+    name TEXT,
+    engagement_score REAL,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clients_email ON clients(email);
+CREATE TABLE IF NOT EXISTS runs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT UNIQUE NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    email_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS emails (
+    id TEXT PRIMARY KEY,
+    run_seq INTEGER NOT NULL REFERENCES runs(seq),
+    position INTEGER NOT NULL,
+    client_id TEXT,
+    client_email TEXT,
+    sent_date TEXT,
+    priority_score INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_emails_run ON emails(run_seq, position);
+CREATE INDEX IF NOT EXISTS idx_emails_client_email ON emails(client_email, run_seq, position);
+CREATE INDEX IF NOT EXISTS idx_emails_sent_date ON emails(sent_date);
+CREATE TABLE IF NOT EXISTS responses (
+    id TEXT PRIMARY KEY,
+    email_id TEXT,
+    client_email TEXT,
+    response_date TEXT,
+    priority TEXT,
+    sentiment TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_email_id ON responses(email_id);
+CREATE INDEX IF NOT EXISTS idx_responses_client_email ON responses(client_email);
+CREATE INDEX IF NOT EXISTS idx_responses_date ON responses(response_date);
+CREATE INDEX IF NOT EXISTS idx_responses_priority ON responses(priority);
+CREATE INDEX IF NOT EXISTS idx_responses_sentiment ON responses(sentiment);
+"""
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False)
+
+
+class SQLiteStorage(Storage):
+    """SQLite (WAL) storage with indexed tables and append-only run history.
+
+    Full records are stored as JSON alongside the indexed columns, so fields
+    round-trip unchanged. A `data_version` counter in the meta table is bumped
+    by every write, which lets other processes notice changes cheaply.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = str(path)
+        self.location = self.path
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', '0')")
+        self._conn.commit()
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _write(self, statements: List[Tuple[str, List[tuple]]]) -> None:
+        """Run executemany batches in one transaction and bump the data version."""
+        with self._lock:
+            with self._conn:
+                for sql, rows in statements:
+                    self._conn.executemany(sql, rows)
+                self._conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'data_version'")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def refresh(self) -> int:
+        return int(self.get_meta("data_version") or 0)
+
+    def _latest_run_seq(self) -> Optional[int]:
+        rows = self._query("SELECT MAX(seq) FROM runs")
+        return rows[0][0] if rows else None
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self._query("SELECT data FROM clients ORDER BY rowid")]
+
+    def current_emails(self) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT data FROM emails WHERE run_seq = (SELECT MAX(seq) FROM runs) ORDER BY position"
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def list_responses(self) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self._query("SELECT data FROM responses ORDER BY rowid")]
+
+    def responses_with_context(
+        self, email_fallback: bool = True, ids: Optional[List[str]] = None
+    ) -> List[ResponseContext]:
+        fallback = """
+            (SELECT f.data FROM emails f
+             WHERE f.client_email = r.client_email AND f.run_seq = (SELECT MAX(seq) FROM runs)
+             ORDER BY f.position LIMIT 1)""" if email_fallback else "NULL"
+        rows = self._query(f"""
+            SELECT r.data,
+                   COALESCE(e.data, {fallback}),
+                   (SELECT c.data FROM clients c WHERE c.email = r.client_email ORDER BY c.rowid LIMIT 1)
+            FROM responses r
+            LEFT JOIN emails e ON e.id = r.email_id
+            {"WHERE r.id IN (SELECT value FROM json_each(?))" if ids is not None else ""}
+            ORDER BY r.rowid
+        """, [json.dumps(ids)] if ids is not None else [])
+        return [
+            (json.loads(response), json.loads(email) if email else None, json.loads(client) if client else None)
+            for response, email, client in rows
+        ]
+
+    def metrics(self) -> Dict[str, Any]:
+        latest = self._latest_run_seq()
+        total_emails = self._query("SELECT COUNT(*) FROM emails WHERE run_seq = ?", (latest,))[0][0]
+        last_sent = self._query(
+            "SELECT sent_date FROM emails WHERE run_seq = ? ORDER BY position DESC LIMIT 1", (latest,)
+        )
+        total_responses = self._query("SELECT COUNT(*) FROM responses")[0][0]
+        high_priority = self._query("SELECT COUNT(*) FROM responses WHERE priority = 'high'")[0][0]
+        sentiment_counts = dict(self._query(
+            "SELECT COALESCE(sentiment, 'neutral'), COUNT(*) FROM responses GROUP BY 1"
+        ))
+        total_clients, avg_engagement = self._query(
+            "SELECT COUNT(*), AVG(COALESCE(engagement_score, 0)) FROM clients"
+        )[0]
+        return {
+            "total_emails": total_emails,
+            "total_responses": total_responses,
+            "total_clients": total_clients,
+            "high_priority_responses": high_priority,
+            "avg_engagement_score": avg_engagement or 0,
+            "sentiment_counts": sentiment_counts,
+            "last_sent_date": last_sent[0][0] if last_sent else None
+        }
+
+    def _page_query(
+        self, select: str, where: List[str], params: List[Any], order: str, limit: int, key_columns: int
+    ) -> Page:
+        """Run a keyset-paginated SELECT whose first `key_columns` columns form the cursor and last is the data."""
+        sql = f"{select} {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order} LIMIT ?"
+        rows = self._query(sql, params + [limit + 1])
+        next_cursor = encode_cursor(list(rows[limit - 1][:key_columns])) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    @staticmethod
+    def _range_filters(column: str, since: Optional[str], until: Optional[str], where: List[str], params: List[Any]) -> None:
+        if since is not None:
+            where.append(f"{column} >= ?")
+            params.append(since)
+        if until is not None:
+            where.append(f"{column} < ?")
+            params.append(until)
+
+    def page_emails(self, cursor=None, limit=100, client=None, since=None, until=None, min_priority=None,
+                    history=False) -> Page:
+        where: List[str] = []
+        params: List[Any] = []
+        if not history:
+            where.append("run_seq = (SELECT MAX(seq) FROM runs)")
+        if client is not None:
+            where.append("(client_email = ? OR client_id = ?)")
+            params += [client, client]
+        self._range_filters("sent_date", since, until, where, params)
+        if min_priority is not None:
+            where.append("priority_score >= ?")
+            params.append(min_priority)
+        if cursor:
+            run_seq, position = decode_cursor(cursor, (int, int))
+            where.append("(run_seq < ? OR (run_seq = ? AND position > ?))")
+            params += [run_seq, run_seq, position]
+        rows, next_cursor = self._page_query(
+            "SELECT run_seq, position, data FROM emails", where, params, "run_seq DESC, position", limit, 2
+        )
+        return [json.loads(row[2]) for row in rows], next_cursor
+
+    def page_responses(self, cursor=None, limit=100, client=None, sentiment=None, priority=None,
+                       since=None, until=None) -> Page:
+        where: List[str] = []
+        params: List[Any] = []
+        for column, value in (("client_email", client), ("sentiment", sentiment), ("priority", priority)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        self._range_filters("response_date", since, until, where, params)
+        if cursor:
+            where.append("rowid > ?")
+            params.append(decode_cursor(cursor, (int,))[0])
+        rows, next_cursor = self._page_query("SELECT rowid, data FROM responses", where, params, "rowid", limit, 1)
+        return [json.loads(row[1]) for row in rows], next_cursor
+
+    def page_clients(self, cursor=None, limit=100, industry=None, min_engagement=None) -> Page:
+        where: List[str] = []
+        params: List[Any] = []
+        if industry is not None:
+            where.append("json_extract(data, '$.industry') = ?")
+            params.append(industry)
+        if min_engagement is not None:
+            where.append("COALESCE(engagement_score, 0) >= ?")
+            params.append(min_engagement)
+        if cursor:
+            where.append("rowid > ?")
+            params.append(decode_cursor(cursor, (int,))[0])
+        rows, next_cursor = self._page_query("SELECT rowid, data FROM clients", where, params, "rowid", limit, 1)
+        return [json.loads(row[1]) for row in rows], next_cursor
+
+    def page_activity(self, cursor=None, limit=100, client=None, kind=None, sentiment=None, priority=None,
+                      since=None, until=None) -> Page:
+        # kind 0 = email, 1 = response; ord is position / rowid within each
+        arms = []
+        params: List[Any] = []
+        for arm_kind, select, ts_column in (
+            ("email", "SELECT sent_date AS ts, 0 AS kind, position AS ord, data FROM emails "
+                      "WHERE run_seq = (SELECT MAX(seq) FROM runs)", "sent_date"),
+            ("response", "SELECT response_date AS ts, 1 AS kind, rowid AS ord, data FROM responses "
+                         "WHERE 1 = 1", "response_date"),
+        ):
+            if kind is not None and kind != arm_kind:
+                continue
+            if arm_kind == "email" and (sentiment is not None or priority is not None):
+                continue
+            where = [select]
+            if client is not None:
+                where.append("client_email = ?")
+                params.append(client)
+            if arm_kind == "response":
+                for column, value in (("sentiment", sentiment), ("priority", priority)):
+                    if value is not None:
+                        where.append(f"{column} = ?")
+                        params.append(value)
+            conditions: List[str] = []
+            self._range_filters(ts_column, since, until, conditions, params)
+            arms.append(" AND ".join(where + conditions))
+
+        if not arms:
+            return [], None
+
+        outer: List[str] = []
+        if cursor:
+            ts, cursor_kind, ordinal = decode_cursor(cursor, ((str, type(None)), int, int))
+            # The plain `ts <= ?` bound lets each arm seek its date index
+            outer.append("ts <= ? AND (ts < ? OR (ts = ? AND (kind > ? OR (kind = ? AND ord > ?))))")
+            params += [ts, ts, ts, cursor_kind, cursor_kind, ordinal]
+        rows, next_cursor = self._page_query(
+            f"SELECT ts, kind, ord, data FROM ({' UNION ALL '.join(arms)})",
+            outer, params, "ts DESC, kind, ord", limit, 3
+        )
+        return [("email" if row[1] == 0 else "response", json.loads(row[3])) for row in rows], next_cursor
+
+    def record_run(self, run_id: str, emails: List[Dict[str, Any]], started_at: str, finished_at: str) -> None:
+        with self._lock:
+            with self._conn:
+                seq = self._conn.execute(
+                    "INSERT INTO runs (run_id, started_at, finished_at, email_count) VALUES (?, ?, ?, ?)",
+                    (run_id, started_at, finished_at, len(emails))
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO emails (id, run_seq, position, client_id, client_email, sent_date, "
+                    "priority_score, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(e["id"], seq, i, e.get("client_id"), e.get("client_email"), e.get("sent_date") or "",
+                      e.get("priority_score"), _dumps(e)) for i, e in enumerate(emails)]
+                )
+                self._conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'data_version'")
+        self._notify("run", emails)
+
+    def save_clients(self, clients: List[Dict[str, Any]]) -> None:
+        now = datetime.now().isoformat()
+        self._write([(
+            "INSERT INTO clients (client_id, email, name, engagement_score, data, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(client_id) DO UPDATE SET email = excluded.email, "
+            "name = excluded.name, engagement_score = excluded.engagement_score, data = excluded.data, "
+            "updated_at = excluded.updated_at",
+            [(c["client_id"], c.get("email"), c.get("name"), c.get("engagement_score"), _dumps(c), now)
+             for c in clients]
+        )])
+        self._notify("clients", clients)
+
+    def add_responses(self, responses: List[Dict[str, Any]]) -> None:
+        self._write([(
+            "INSERT INTO responses (id, email_id, client_email, response_date, priority, sentiment, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET email_id = excluded.email_id, "
+            "client_email = excluded.client_email, response_date = excluded.response_date, "
+            "priority = excluded.priority, sentiment = excluded.sentiment, data = excluded.data",
+            [(r["id"], r.get("email_id"), r.get("client_email"), r.get("response_date") or "", r.get("priority"),
+              r.get("sentiment", "neutral"), _dumps(r)) for r in responses]
+        )])
+        self._notify("responses", responses)
+
+
+def _load_json_list(file_path: Path) -> List[Dict[str, Any]]:
+    try:
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def import_json_files(storage: SQLiteStorage, data_dir: Path) -> Dict[str, int]:
+    """Copy client_context.json, emails_sent.json and responses.json into SQLite.
+
+    Clients and responses are upserted by id. The emails become one imported
+    run only while the database has no runs: SQLite runs never write
+    emails_sent.json, so importing it later would replace the latest run with
+    stale emails. Safe to re-run.
+    """
+    data_dir = Path(data_dir)
+    clients = _load_json_list(data_dir / "client_context.json")
+    # Emails are only seeded into an empty run history
+    emails = _load_json_list(data_dir / "emails_sent.json") if storage._latest_run_seq() is None else []
+    responses = _load_json_list(data_dir / "responses.json")
+
+    if clients:
+        storage.save_clients(clients)
+    if emails:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        sent_dates = [e.get("sent_date") or "" for e in emails]
+        storage.record_run(f"import_{stamp}", emails, min(sent_dates), max(sent_dates))
+    if responses:
+        storage.add_responses(responses)
+
+    storage.set_meta("imported_at", datetime.now().isoformat())
+    return {"clients": len(clients), "emails": len(emails), "responses": len(responses)}
+
+
+@lru_cache(maxsize=None)
+def get_storage(data_dir: Path = DEFAULT_DATA_DIR, backend: str = STORAGE_BACKEND) -> Storage:
+    """Process-wide storage for a data directory, importing the JSON files into a new SQLite database."""
+    data_dir = Path(data_dir)
+    if backend == "json":
+        return JSONStorage(data_dir)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown storage backend '{backend}'. Choose from: sqlite, json")
+
+    storage = SQLiteStorage(data_dir / SQLITE_FILENAME)
+    if storage.get_meta("imported_at") is None:
+        counts = import_json_files(storage, data_dir)
+        print(f"📥 Imported {counts['clients']} clients, {counts['emails']} emails and "
+              f"{counts['responses']} responses into {storage.location}")
+    return storage
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jarvis storage utilities")
+    parser.add_argument("command", choices=["import"], help="import: copy the JSON data files into SQLite (emails only into an empty database)")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR))
+    args = parser.parse_args()
+
+    storage = SQLiteStorage(Path(args.data_dir) / SQLITE_FILENAME)
+    counts = import_json_files(storage, Path(args.data_dir))
+    print(f"✅ Imported {counts['clients']} clients, {counts['emails']} emails and "
+          f"{counts['responses']} responses into {storage.location}")
@@ -0,0 +1,99 @@
+"""
+Client Triage
+Cheap local pre-scoring that picks which clients are worth an LLM analysis.
+Each client gets a 0-1 score from its engagement score, how recently it was
+in touch, the pain points on its record and how strongly the document search
+matched it; only the best `shortlist_size` go on to the agent workflow, so
+LLM calls per run scale with top_n rather than with the size of the book.
+"""
+import heapq
+import math
+import os
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Set JARVIS_TRIAGE=off to analyse every client
+TRIAGE_ENABLED = os.getenv("JARVIS_TRIAGE", "on").lower() not in ("0", "off", "false")
+
+# Shortlist size as a multiple of top_n (a wider net catches clients the LLM rates higher)
+SHORTLIST_FACTOR = float(os.getenv("JARVIS_TRIAGE_SHORTLIST_FACTOR", "3"))
+
+# Days after which the recency signal has halved
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("JARVIS_TRIAGE_RECENCY_HALF_LIFE_DAYS", "30"))
+
+WEIGHTS = {"engagement": 0.4, "recency": 0.25, "pain_points": 0.2, "documents": 0.15}
+
+# Pain-point terms that signal a timely advice opportunity, matched on word prefixes
+PAIN_KEYWORDS = {
+    "tax": 1.0, "inherit": 1.0, "retire": 1.0, "sale": 1.0, "sell": 1.0, "sold": 1.0, "exit": 1.0,
+    "succession": 1.0, "pension": 0.8, "mortgage": 0.8, "annuit": 0.8, "drawdown": 0.8,
+    "capital": 0.8, "valuation": 0.8, "protection": 0.6, "allowance": 0.6, "isa": 0.6,
+    "worr": 0.5, "unsure": 0.5, "stress": 0.5, "concern": 0.5, "risen": 0.5, "cash": 0.4,
+}
+# Total keyword weight at which the pain-point signal saturates
+PAIN_SATURATION = 3.0
+
+WORD = re.compile(r"[a-z]+")
+
+
+def shortlist_size(top_n: int) -> int:
+    return max(top_n, math.ceil(top_n * SHORTLIST_FACTOR))
+
+
+def engagement_signal(client: Dict[str, Any]) -> float:
+    try:
+        return min(1.0, max(0.0, float(client.get("engagement_score", 0)) / 100))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def recency_signal(client: Dict[str, Any], today: date) -> float:
+    """1.0 for contact today, halving every RECENCY_HALF_LIFE_DAYS; 0.0 when unknown."""
+    try:
+        last = date.fromisoformat(str(client.get("last_interaction", ""))[:10])
+    except ValueError:
+        return 0.0
+    return 0.5 ** (max(0, (today - last).days) / RECENCY_HALF_LIFE_DAYS)
+
+
+def pain_point_signal(client: Dict[str, Any]) -> float:
+    words = WORD.findall(" ".join(client.get("pain_points", [])).lower())
+    matched = {keyword for word in words for keyword in PAIN_KEYWORDS if word.startswith(keyword)}
+    return min(1.0, sum(PAIN_KEYWORDS[keyword] for keyword in matched) / PAIN_SATURATION)
+
+
+def document_signal(hits: Optional[List[Dict[str, Any]]], expected_hits: int) -> float:
+    """How well the document search matched: best vector similarity, else share of hits found."""
+    if not hits:
+        return 0.0
+    similarities = [1 / (1 + hit["distance"]) for hit in hits if hit.get("distance") is not None]
+    if similarities:
+        return max(similarities)
+    return min(1.0, len(hits) / max(1, expected_hits))
+
+
+def score_client(client: Dict[str, Any], hits: Optional[List[Dict[str, Any]]],
+                 today: date, expected_hits: int = 3) -> Dict[str, float]:
+    """Weighted triage score plus its component signals."""
+    signals = {
+        "engagement": engagement_signal(client),
+        "recency": recency_signal(client, today),
+        "pain_points": pain_point_signal(client),
+        "documents": document_signal(hits, expected_hits),
+    }
+    signals["score"] = sum(WEIGHTS[name] * value for name, value in signals.items())
+    return {name: round(value, 4) for name, value in signals.items()}
+
+
+def shortlist(
+    clients: List[Dict[str, Any]], hits_by_client: Dict[str, List[Dict[str, Any]]], size: int,
+    today: Optional[date] = None, expected_hits: int = 3
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, float]]]:
+    """The `size` best-scoring clients (in book order) and every client's triage score."""
+    today = today or date.today()
+    scores = {c["client_id"]: score_client(c, hits_by_client.get(c["client_id"]), today, expected_hits)
+              for c in clients}
+    best = heapq.nlargest(size, range(len(clients)), key=lambda i: scores[clients[i]["client_id"]]["score"])
+    return [clients[i] for i in sorted(best)], scores